@@ -0,0 +1,240 @@
+# Content-addressed product image cache.
+# Images are stored once per sha256 of their bytes, so the same picture
+# referenced by many listings (or many URLs) only takes disk space once.
+# The file extension is sniffed from the bytes too, never taken from headers.
+# Thumbnails need Pillow; without it only the originals are cached.
+import asyncio, hashlib, os, json, tempfile
+from datetime import datetime
+from io import BytesIO
+from urllib.parse import urljoin, urlparse
+import httpx
+import sqlite_utils
+from scraper_requests import HEADERS, DEFAULT_TIMEOUT, pick_ua
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are optional
+    Image = None
+
+DB_PATH = os.environ.get('BOT_DB', 'bot.db')
+CACHE_DIR = os.environ.get('BOT_IMAGE_CACHE', '')
+MAX_CONCURRENCY = int(os.environ.get('BOT_IMAGE_CONCURRENCY', '8'))
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+THUMB_SIZE = (256, 256)
+
+EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+    'image/avif': 'avif',
+}
+
+db = sqlite_utils.Database(DB_PATH)
+
+def ensure_tables():
+    if 'images' not in db.table_names():
+        # url -> content key, lets repeated URLs skip the download entirely
+        db['images'].create({
+            "url": str,
+            "key": str,
+            "path": str,
+            "thumbnail": str,
+            "content_type": str,
+            "size": int,
+            "created_at": str
+        }, pk="url")
+
+def enabled():
+    return bool(CACHE_DIR)
+
+def content_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+def key_path(key, ext, root=None):
+    # fan out by the first two bytes so no directory grows too large
+    root = root or CACHE_DIR
+    return os.path.join(root, 'originals', key[:2], key[2:4], f'{key}.{ext}')
+
+def thumb_path(key, root=None):
+    root = root or CACHE_DIR
+    w, h = THUMB_SIZE
+    return os.path.join(root, f'thumbs_{w}x{h}', key[:2], key[2:4], f'{key}.jpg')
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def make_thumbnail(data):
+    if Image is None:
+        return None
+    with Image.open(BytesIO(data)) as im:
+        im = im.convert('RGB')
+        im.thumbnail(THUMB_SIZE)
+        # pad to a fixed canvas so the app can lay out thumbnails uniformly
+        canvas = Image.new('RGB', THUMB_SIZE, (255, 255, 255))
+        canvas.paste(im, ((THUMB_SIZE[0] - im.width) // 2, (THUMB_SIZE[1] - im.height) // 2))
+        out = BytesIO()
+        canvas.save(out, 'JPEG', quality=85, optimize=True)
+        return out.getvalue()
+
+def sniff_type(data):
+    """Image MIME type from the magic bytes, '' when unknown."""
+    if data[:3] == b'\xff\xd8\xff':
+        return 'image/jpeg'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'image/avif'
+    return ''
+
+def store_image(data):
+    """Store raw image bytes, returns (key, relative original path, relative thumbnail path)."""
+    key = content_key(data)
+    # same bytes, same file, whatever Content-Type each server sent
+    ext = EXTENSIONS.get(sniff_type(data), 'bin')
+    path = key_path(key, ext)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+    thumb = thumb_path(key)
+    if not os.path.exists(thumb):
+        try:
+            thumb_data = make_thumbnail(data)
+        except Exception as e:
+            print('Thumbnail failed', key, e)
+            thumb_data = None
+        if thumb_data is None:
+            thumb = ''
+        else:
+            _write_atomic(thumb, thumb_data)
+    return key, os.path.relpath(path, CACHE_DIR), os.path.relpath(thumb, CACHE_DIR) if thumb else ''
+
+def lookup(url):
+    ensure_tables()
+    try:
+        return db['images'].get(url)
+    except sqlite_utils.db.NotFoundError:
+        return None
+
+async def _fetch(client, sem, url):
+    async with sem:
+        headers = HEADERS.copy()
+        headers['User-Agent'] = pick_ua()
+        async with client.stream('GET', url, headers=headers, follow_redirects=True) as resp:
+            if resp.status_code != 200:
+                raise Exception('HTTP ' + str(resp.status_code))
+            content_type = resp.headers.get('content-type', '')
+            if content_type and not content_type.startswith('image/'):
+                raise Exception('not an image: ' + content_type)
+            if int(resp.headers.get('content-length') or 0) > MAX_IMAGE_BYTES:
+                raise Exception('image too large')
+            # stop reading as soon as the cap is passed, Content-Length can be missing or wrong
+            body = bytearray()
+            async for chunk in resp.aiter_bytes():
+                body += chunk
+                if len(body) > MAX_IMAGE_BYTES:
+                    raise Exception('image too large')
+    data = bytes(body)
+    # hashing and thumbnailing are CPU bound, keep them off the event loop
+    key, path, thumb = await asyncio.to_thread(store_image, data)
+    return {
+        'url': url,
+        'key': key,
+        'thumbnail': thumb,
+        'content_type': sniff_type(data) or content_type,
+        'size': len(data),
+        'created_at': datetime.utcnow().isoformat()
+    }, path
+
+async def cache_images_async(urls, max_concurrency=None):
+    """Download and cache many image URLs with a bounded pool.
+    Returns {url: {'image_key', 'image_path', 'thumbnail_path'}} for the URLs that succeeded."""
+    ensure_tables()
+    todo, results = [], {}
+    for url in dict.fromkeys(u for u in urls if u):
+        row = lookup(url)
+        if row:
+            results[url] = _entry(row)
+        else:
+            todo.append(url)
+    if not todo:
+        return results
+    sem = asyncio.Semaphore(max_concurrency or MAX_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        fetched = await asyncio.gather(*(_fetch(client, sem, u) for u in todo), return_exceptions=True)
+    rows = []
+    for url, res in zip(todo, fetched):
+        if isinstance(res, Exception):
+            print('Image cache failed', url, res)
+            continue
+        row, path = res
+        row['path'] = path
+        rows.append(row)
+        results[url] = _entry(row)
+    if rows:
+        db['images'].upsert_all(rows, pk='url')
+    return results
+
+def _entry(row):
+    return {
+        'image_key': row['key'],
+        'image_path': row['path'],
+        'thumbnail_path': row['thumbnail'],
+    }
+
+def cache_images(urls, max_concurrency=None):
+    return asyncio.run(cache_images_async(urls, max_concurrency))
+
+def image_url(data):
+    """Absolute URL of a result's image; selectors often return relative or //host paths."""
+    url = urljoin(data.get('source_url') or '', (data.get('image') or '').strip())
+    return url if urlparse(url).scheme in ('http', 'https') else ''
+
+def cache_result_image(data):
+    """Pipeline stage for a single extraction result: adds the local keys in place."""
+    url = image_url(data)
+    if not enabled() or not url:
+        return data
+    data.update(cache_images([url]).get(url, {}))
+    return data
+
+# done jobs with an image that has not been cached yet; CASE keeps json_extract off invalid JSON
+BACKFILL_WHERE = """status = 'done' and id > ? and case when json_valid(result) then
+    coalesce(json_extract(result, '$.image'), '') != '' and json_extract(result, '$.image_key') is null
+    else 0 end"""
+
+def backfill_done_jobs(limit=500, max_concurrency=None):
+    """Cache images for finished jobs that were scraped before the cache was enabled.
+    Walks the whole table by id in pages of `limit`, so images that fail to download
+    do not keep older jobs from ever being reached."""
+    if not enabled():
+        return 0
+    updated, after = 0, 0
+    while True:
+        pending = {}
+        for row in db['jobs'].rows_where(BACKFILL_WHERE, [after], order_by='id', limit=limit):
+            pending[row['id']] = json.loads(row['result'])
+            after = row['id']
+        if not pending:
+            return updated
+        cached = cache_images([image_url(d) for d in pending.values()], max_concurrency)
+        for job_id, data in pending.items():
+            entry = cached.get(image_url(data))
+            if entry:
+                data.update(entry)
+                db['jobs'].update(job_id, {'result': json.dumps(data)})
+                updated += 1
+
+if __name__ == '__main__':
+    import sys
+    if not enabled():
+        print('Set BOT_IMAGE_CACHE to the cache directory')
+        sys.exit(1)
+    print('Backfilled', backfill_done_jobs(limit=int(sys.argv[1]) if len(sys.argv) > 1 else 500), 'jobs')
@@ -0,0 +1,259 @@
+# Streaming stage from finished scrape jobs to NFT mints.
+# A reader thread tails jobs that turned 'done' after the checkpoint and feeds a
+# bounded queue; the minter drains it in batches, mints each batch with
+# MockWeb3Service.batch_mint_nfts (one transaction per MINTS_PER_TX items) and commits
+# the mint records together with the new checkpoint, so a restart resumes right after
+# the last committed batch. A failed mint stops the pipeline with the checkpoint just
+# before it, so the next run retries it. The bounded queue is the backpressure:
+# when minting falls behind, the reader blocks instead of loading the whole table.
+import os, sys, json, re, time, queue, threading
+from datetime import datetime
+from urllib.parse import urlparse, urldefrag
+import sqlite_utils
+
+DB_PATH = os.environ.get('BOT_DB', 'bot.db')
+CONTRACTS_DIR = os.environ.get(
+    'BOT_MOCK_CONTRACTS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'smart-contracts'))
+CHAIN_LOG = os.environ.get('BOT_CHAIN_LOG', '')  # mock chain op log, required: minted rows must outlive the process
+NFT_OWNER = os.environ.get('BOT_NFT_OWNER', '0x000000000000000000000000000000000000cafe')
+MAX_SUPPLY = int(os.environ.get('BOT_NFT_MAX_SUPPLY', '1000000'))
+BATCH_SIZE = int(os.environ.get('BOT_NFT_BATCH', '100'))
+MINTS_PER_TX = int(os.environ.get('BOT_NFT_MINTS_PER_TX', '200'))  # 200 mints stay under the 30M block gas limit
+MAX_PENDING = int(os.environ.get('BOT_NFT_MAX_PENDING', '1000'))
+POLL_INTERVAL = float(os.environ.get('BOT_NFT_POLL', '3'))
+BATCH_WAIT = 0.5  # max seconds a partial batch waits for more jobs
+PAGE_SIZE = 500
+CHECKPOINT = 'nft_pipeline'
+
+_END = object()
+
+db = sqlite_utils.Database(DB_PATH)
+
+def ensure_tables():
+    names = db.table_names()
+    if 'nft_mints' not in names:
+        # one row per source_url, the dedupe key of the pipeline
+        db['nft_mints'].create({
+            "source_url": str,
+            "job_id": int,
+            "status": str,
+            "token_id": int,
+            "tx_hash": str,
+            "error": str,
+            "created_at": str
+        }, pk="source_url")
+    if 'checkpoints' not in names:
+        db['checkpoints'].create({
+            "name": str,
+            "updated_at": str,
+            "job_id": int
+        }, pk="name")
+    if 'jobs' in names:
+        db['jobs'].create_index(['status', 'updated_at', 'id'], if_not_exists=True)
+
+def open_chain(log_path):
+    """MockWeb3Service to mint into, replayed from and logging to the op log at log_path."""
+    if not log_path:
+        # an in-memory chain would lose the tokens that nft_mints says exist
+        raise Exception('no chain op log, set BOT_CHAIN_LOG')
+    if CONTRACTS_DIR not in sys.path:
+        sys.path.insert(0, CONTRACTS_DIR)
+    from mock_contracts import MockWeb3Service
+    import mock_state
+    service = MockWeb3Service()
+    service.nft_contract.max_supply = max(service.nft_contract.max_supply, MAX_SUPPLY)
+    if os.path.exists(log_path):
+        print('Replayed', mock_state.replay(service, log_path), 'chain operations from', log_path)
+    mock_state.attach_log(service, log_path)
+    return service
+
+def load_checkpoint():
+    try:
+        row = db['checkpoints'].get(CHECKPOINT)
+        return row['updated_at'], row['job_id']
+    except sqlite_utils.db.NotFoundError:
+        return '', 0
+
+def normalize_url(url):
+    return urldefrag((url or '').strip())[0]
+
+def normalize_price(price):
+    # "1 299,00" -> "1299,00"; scrapers already cut the currency off
+    return re.sub(r'\s', '', str(price or ''))
+
+def result_to_metadata(data, connector=''):
+    """Map a scrape result (title, image, price, source_url) to mint_nft arguments."""
+    url = normalize_url(data.get('source_url'))
+    attributes = []
+    price = normalize_price(data.get('price'))
+    if price:
+        attributes.append({'trait_type': 'Price', 'value': price})
+    host = urlparse(url).hostname or ''
+    marketplace = connector if connector and connector != 'generic' else host.removeprefix('www.')
+    if marketplace:
+        attributes.append({'trait_type': 'Marketplace', 'value': marketplace})
+    attributes.append({'trait_type': 'Source URL', 'value': url})
+    return {
+        'name': (data.get('title') or '').strip()[:200] or url,
+        'description': 'Imported from ' + url,
+        'image': data.get('image') or '',
+        'attributes': attributes
+    }
+
+def _put(q, item, stop):
+    # blocking put that still notices shutdown
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def tail_done_jobs(q, stop, after, follow=True, poll_interval=POLL_INTERVAL):
+    """Reader thread: queue done jobs newer than `after` in (updated_at, id) order."""
+    rdb = sqlite_utils.Database(DB_PATH)  # sqlite connections are per thread
+    updated_at, job_id = after
+    while not stop.is_set():
+        rows = []
+        if 'jobs' in rdb.table_names():
+            rows = list(rdb['jobs'].rows_where(
+                "status = 'done' and (updated_at > ? or (updated_at = ? and id > ?))",
+                [updated_at, updated_at, job_id], order_by='updated_at, id', limit=PAGE_SIZE))
+        for row in rows:
+            if not _put(q, row, stop):
+                return
+            updated_at, job_id = row['updated_at'], row['id']
+        if len(rows) < PAGE_SIZE:
+            if not follow:
+                _put(q, _END, stop)
+                return
+            stop.wait(poll_interval)
+
+def take_batch(q, batch_size, wait=BATCH_WAIT):
+    """Up to batch_size queued items; waits at most `wait` seconds to fill a started batch."""
+    try:
+        batch = [q.get(timeout=1.0)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + wait
+    while len(batch) < batch_size and batch[-1] is not _END:
+        remaining = deadline - time.monotonic()
+        try:
+            batch.append(q.get_nowait() if remaining <= 0 else q.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def mint_batch(service, rows, owner=NFT_OWNER):
+    """Mint a batch of done jobs, then commit the mint records and checkpoint together.
+
+    On a failed mint the checkpoint only moves up to the job before it."""
+    counts = {'minted': 0, 'duplicates': 0, 'failed': 0}
+    now = datetime.utcnow().isoformat()
+    items = []
+    for row in rows:
+        try:
+            data = json.loads(row['result'] or '{}')
+        except ValueError:
+            data = {}
+        items.append((row, data, normalize_url(data.get('source_url') or row['url'])))
+    urls = list(dict.fromkeys(url for _, _, url in items))
+    minted = set()
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        minted.update(r['source_url'] for r in db['nft_mints'].rows_where(
+            "status = 'minted' and source_url in (%s)" % ','.join('?' * len(chunk)), chunk,
+            select='source_url'))
+    records = []
+    pending = []  # (position in rows, row, url, batch_mint_nfts entry)
+    for i, (row, data, url) in enumerate(items):
+        if url in minted:
+            counts['duplicates'] += 1
+            continue
+        minted.add(url)
+        # the chain may hold mints whose batch never committed here (crash after minting)
+        found = service.get_nfts_by_traits({'Source URL': url}, limit=1)
+        if found:
+            counts['duplicates'] += 1
+            records.append({'source_url': url, 'job_id': row['id'], 'status': 'minted',
+                            'token_id': found[0]['token_id'], 'tx_hash': '', 'error': '', 'created_at': now})
+            continue
+        data['source_url'] = url
+        meta = result_to_metadata(data, row.get('connector') or '')
+        pending.append((i, row, url, (owner, meta['name'], meta['description'], meta['image'], meta['attributes'])))
+    done = len(rows)  # rows before this position are finished
+    for c in range(0, len(pending), MINTS_PER_TX):
+        chunk = pending[c:c + MINTS_PER_TX]
+        res = service.batch_mint_nfts([mint for _, _, _, mint in chunk])
+        if not res['success']:
+            done = chunk[0][0]
+            counts['failed'] = len(pending) - c
+            print('Mint failed from job', chunk[0][1]['id'], res['error'])
+            records.extend({'source_url': url, 'job_id': row['id'], 'status': 'failed', 'token_id': None,
+                            'tx_hash': '', 'error': res['error'], 'created_at': now}
+                           for _, row, url, _ in chunk)
+            break
+        counts['minted'] += len(chunk)
+        records.extend({'source_url': url, 'job_id': row['id'], 'status': 'minted', 'token_id': token_id,
+                        'tx_hash': res['transactionHash'], 'error': '', 'created_at': now}
+                       for (_, row, url, _), token_id in zip(chunk, res['tokenIds']))
+    if service.op_log is not None:
+        service.op_log.flush()  # chain state must be durable before the checkpoint moves
+    with db.conn:
+        if records:
+            db['nft_mints'].upsert_all(records, pk='source_url')
+        if done:
+            last = rows[done - 1]
+            db['checkpoints'].upsert({'name': CHECKPOINT, 'updated_at': last['updated_at'],
+                                      'job_id': last['id']}, pk='name')
+    return counts
+
+def run(service=None, owner=NFT_OWNER, batch_size=BATCH_SIZE, max_pending=MAX_PENDING, follow=True):
+    """Stream done jobs into NFT mints until interrupted (or caught up when follow=False)."""
+    ensure_tables()
+    service = service or open_chain(CHAIN_LOG)
+    after = load_checkpoint()
+    q = queue.Queue(max_pending)
+    stop = threading.Event()
+    reader = threading.Thread(target=tail_done_jobs, args=(q, stop, after, follow), daemon=True)
+    reader.start()
+    totals = {'minted': 0, 'duplicates': 0, 'failed': 0}
+    started = time.monotonic()
+    print('NFT pipeline started after job', after[1] or '-', 'owner', owner)
+    try:
+        while True:
+            batch = take_batch(q, batch_size)
+            ended = bool(batch) and batch[-1] is _END
+            rows = batch[:-1] if ended else batch
+            if rows:
+                counts = mint_batch(service, rows, owner)
+                for k, v in counts.items():
+                    totals[k] += v
+                rate = totals['minted'] / max(time.monotonic() - started, 1e-9)
+                print(f"Batch of {len(rows)}: minted {counts['minted']}, duplicates {counts['duplicates']}, "
+                      f"failed {counts['failed']} | total minted {totals['minted']} ({rate:.0f}/s), queued {q.qsize()}")
+                if counts['failed']:
+                    # later jobs must not move the checkpoint past the failed ones
+                    print('Stopping NFT pipeline, the next run retries from job', load_checkpoint()[1] or '-')
+                    break
+            if ended or (not follow and not reader.is_alive() and q.empty()):
+                break
+    except KeyboardInterrupt:
+        print('Stopping NFT pipeline')
+    finally:
+        stop.set()
+        if service.op_log is not None:
+            service.op_log.flush()
+    return totals
+
+if __name__ == '__main__':
+    once = '--once' in sys.argv[1:]
+    if not CHAIN_LOG:
+        print('Set BOT_CHAIN_LOG to the mock chain op log')
+        sys.exit(1)
+    print('NFT pipeline reading DB:', DB_PATH)
+    totals = run(follow=not once)
+    print('Done:', totals)
+    sys.exit(1 if totals['failed'] else 0)
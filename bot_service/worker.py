@@ -1,6 +1,7 @@
 import sqlite_utils, time, os, json
 from datetime import datetime
 from scraper_requests import scrape_via_requests
+from image_cache import cache_result_image
 from sqlite_utils.db import Table
 
 DB_PATH = os.environ.get('BOT_DB', 'bot.db')
@@ -51,6 +52,11 @@ def process_job_row(row):
     print(f'Processing job {job_id} url={url} connector={connector}')
     try:
         data = scrape_via_requests(url, connector=connector)
+        try:
+            cache_result_image(data)
+        except Exception as e:
+            # a broken image must not fail an otherwise good scrape
+            print('Image cache error', job_id, e)
         db['jobs'].update(job_id, {
             'status': 'done',
             'result': json.dumps(data),
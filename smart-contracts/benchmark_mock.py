@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Load generator and throughput benchmark for the MyModus mock contracts
+Drives a configurable mix of writes and reads through MockWeb3Service and
+reports throughput, latency percentiles and memory per window of operations,
+so costs that grow with state size show up as windows slow down
+
+    python benchmark_mock.py --ops 200000 --window 20000 --output results.json
+    python benchmark_mock.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from mock_concurrent import ConcurrentWeb3Service
+from mock_contracts import MockWeb3Service
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_MIX = {
+    "mint": 30,
+    "list": 15,
+    "buy": 10,
+    "transfer": 20,
+    "history": 10,
+    "listings": 10,
+    "traits": 5,
+}
+
+COLORS = ["Black", "White", "Red", "Blue", "Green", "Beige"]
+SIZES = ["XS", "S", "M", "L", "XL"]
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """Parse "mint=30,buy=10" into weights, unknown operations are rejected"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown operation in mix: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+def percentile(sorted_values: List[int], fraction: float) -> int:
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def memory_mb(use_tracemalloc: bool) -> float:
+    if use_tracemalloc:
+        return tracemalloc.get_traced_memory()[0] / 1e6
+    if resource is not None:
+        # peak RSS: kilobytes on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+    return 0.0
+
+
+class LoadGenerator:
+    """Simulated users issuing a weighted mix of mock contract operations"""
+
+    def __init__(self, service: Union[MockWeb3Service, ConcurrentWeb3Service], addresses: int, seed: int):
+        self.service = service
+        # picking tokens reads the NFT contract directly, under the read lock when shared
+        if isinstance(service, ConcurrentWeb3Service):
+            self.chain, self.reading = service.service, service.lock.read
+        else:
+            self.chain, self.reading = service, nullcontext
+        self.random = random.Random(seed)
+        self.addresses = [f"0x{i:040x}" for i in range(1, addresses + 1)]
+        # give every simulated user loyalty tokens to move around
+        result = service.airdrop_loyalty_tokens(
+            [(address, "1000000000000000000000") for address in self.addresses]
+        )
+        if not result["success"]:
+            raise Exception(result["error"])
+        self.operations: Dict[str, Callable[[], bool]] = {
+            "mint": self.mint,
+            "list": self.list_for_sale,
+            "buy": self.buy,
+            "transfer": self.transfer,
+            "history": self.history,
+            "listings": self.listings,
+            "traits": self.traits,
+        }
+
+    def address(self) -> str:
+        return self.random.choice(self.addresses)
+
+    def random_token(self) -> Optional[int]:
+        with self.reading():
+            supply = self.chain.nft_contract.total_supply
+        return self.random.randint(1, supply) if supply else None
+
+    def mint(self) -> bool:
+        with self.reading():
+            i = self.chain.nft_contract.total_supply + 1
+        return self.service.mint_nft(
+            self.address(),
+            f"MyModus Item #{i}",
+            "Benchmark NFT",
+            f"ipfs://bench/{i}",
+            [
+                {"trait_type": "Color", "value": self.random.choice(COLORS)},
+                {"trait_type": "Size", "value": self.random.choice(SIZES)},
+            ]
+        )["success"]
+
+    def list_for_sale(self) -> bool:
+        token_id = self.random_token()
+        if token_id is None:
+            return False
+        with self.reading():
+            owner = self.chain.nft_contract.nfts.owner_of(token_id)
+        price = str(self.random.randint(1, 10000) * 10 ** 15)
+        return self.service.list_nft_for_sale(token_id, price, owner)["success"]
+
+    def buy(self) -> bool:
+        with self.reading():
+            # buyers mostly pick from the cheap end of the book
+            candidates = self.chain.nft_contract.for_sale.cheapest(20)
+            if not candidates:
+                return False
+            token_id = self.random.choice(candidates)
+            price = self.chain.nft_contract.for_sale[token_id]
+        return self.service.buy_nft(token_id, self.address(), str(price))["success"]
+
+    def transfer(self) -> bool:
+        return self.service.transfer_loyalty_tokens(
+            self.address(), self.address(), str(self.random.randint(1, 10 ** 18))
+        )["success"]
+
+    def history(self) -> bool:
+        self.service.get_transaction_history_page(self.address(), limit=20)
+        return True
+
+    def listings(self) -> bool:
+        self.service.get_nfts_for_sale_page(limit=20, descending=self.random.random() < 0.5)
+        return True
+
+    def traits(self) -> bool:
+        self.service.get_nfts_by_traits(
+            {"Color": self.random.choice(COLORS), "Size": self.random.choice(SIZES)}, limit=20
+        )
+        return True
+
+
+def execute(generator: LoadGenerator, plan: List[str]) -> Tuple[Dict, Dict, Dict]:
+    """Run planned operations in order, returns latencies, time spent and failures by name"""
+    latencies: Dict[str, List[int]] = {}
+    time_spent: Dict[str, int] = {}
+    failures: Dict[str, int] = {}
+    for name in plan:
+        operation = generator.operations[name]
+        op_started = time.perf_counter_ns()
+        ok = operation()
+        took = time.perf_counter_ns() - op_started
+        latencies.setdefault(name, []).append(took)
+        time_spent[name] = time_spent.get(name, 0) + took
+        if not ok:
+            failures[name] = failures.get(name, 0) + 1
+    return latencies, time_spent, failures
+
+
+def summarize(name: str, latencies: List[int], failures: int, elapsed_ns: int) -> Dict:
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "operation": name,
+        "count": count,
+        "failures": failures,
+        "ops_per_sec": round(count / (elapsed_ns / 1e9), 1) if elapsed_ns else 0.0,
+        "mean_us": round(sum(latencies) / count / 1000, 2) if count else 0.0,
+        "p50_us": round(percentile(latencies, 0.50) / 1000, 2),
+        "p95_us": round(percentile(latencies, 0.95) / 1000, 2),
+        "p99_us": round(percentile(latencies, 0.99) / 1000, 2),
+        "max_us": round(latencies[-1] / 1000, 2) if count else 0.0,
+    }
+
+
+def run(ops: int, window: int, addresses: int, mix: Dict[str, int], seed: int,
+        max_supply: Optional[int], use_tracemalloc: bool, quiet: bool = False,
+        block_time: Optional[float] = None, gas_limit: int = 30000000,
+        threads: int = 1) -> Dict:
+    """Run the benchmark and return the machine-readable results.
+    
+    With threads > 1 each window is split between that many concurrent
+    users driving a ConcurrentWeb3Service, so latencies include queueing
+    behind other users' writes.
+    """
+    if use_tracemalloc:
+        tracemalloc.start()
+    service = MockWeb3Service()
+    if max_supply is not None:
+        service.nft_contract.max_supply = max_supply
+    if block_time is not None:
+        service.configure_blocks(gas_limit, block_time)
+    chain = service  # the window stats below are read between windows, when no call is running
+    pool = None
+    if threads > 1:
+        service = ConcurrentWeb3Service(service)
+        pool = ThreadPoolExecutor(threads)
+    generator = LoadGenerator(service, addresses, seed)
+
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    windows = []
+    done = 0
+    total_started = time.perf_counter_ns()
+    while done < ops:
+        size = min(window, ops - done)
+        plan = generator.random.choices(names, weights, k=size)
+        latencies: Dict[str, List[int]] = {name: [] for name in names}
+        time_spent: Dict[str, int] = {name: 0 for name in names}
+        failures: Dict[str, int] = {name: 0 for name in names}
+        started = time.perf_counter_ns()
+        if pool is None:
+            parts = [execute(generator, plan)]
+        else:
+            parts = list(pool.map(lambda i: execute(generator, plan[i::threads]), range(threads)))
+        elapsed = time.perf_counter_ns() - started
+        for part_latencies, part_time, part_failures in parts:
+            for name, values in part_latencies.items():
+                latencies[name].extend(values)
+                time_spent[name] += part_time[name]
+                failures[name] += part_failures.get(name, 0)
+        done += size
+
+        nft = chain.nft_contract
+        result = {
+            "ops_done": done,
+            "ops_per_sec": round(size / (elapsed / 1e9), 1),
+            "memory_mb": round(memory_mb(use_tracemalloc), 1),
+            "state": {
+                "nfts": nft.total_supply,
+                "max_supply": nft.max_supply,
+                "listed": len(nft.for_sale),
+                "transactions": len(chain.transactions),
+                "pending": len(chain.mempool),
+                "blocks": len(chain.blocks),
+                "base_fee": chain.block_builder.base_fee,
+                "logs": len(chain.event_index),
+            },
+            "operations": {
+                name: summarize(name, latencies[name], failures[name], time_spent[name])
+                for name in names
+            },
+        }
+        windows.append(result)
+        if not quiet:
+            slowest = max(result["operations"].values(), key=lambda o: o["p99_us"])
+            print(f"{done:>10} ops  {result['ops_per_sec']:>10.0f} ops/s  "
+                  f"nfts={nft.total_supply:<8} txs={len(chain.transactions):<9} "
+                  f"mem={result['memory_mb']:.0f}MB  slowest p99: "
+                  f"{slowest['operation']} {slowest['p99_us']}us")
+
+    if use_tracemalloc:
+        tracemalloc.stop()
+    service.mine()
+    if pool is not None:
+        pool.shutdown()
+        service.close()
+    blocks = chain.blocks
+    simulated_seconds = blocks[-1].timestamp - blocks[0].timestamp if len(blocks) > 1 else 0.0
+    return {
+        "benchmark": "mock_web3_service",
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "ops": ops,
+            "window": window,
+            "addresses": addresses,
+            "mix": mix,
+            "seed": seed,
+            "max_supply": max_supply,
+            "memory": "tracemalloc" if use_tracemalloc else "peak_rss",
+            "block_time": block_time,
+            "gas_limit": gas_limit,
+            "threads": threads,
+        },
+        "total_seconds": round((time.perf_counter_ns() - total_started) / 1e9, 3),
+        "chain": {
+            "blocks": len(blocks),
+            "transactions_per_block": round(len(chain.transactions) / len(blocks), 1) if blocks else 0.0,
+            "simulated_seconds": simulated_seconds,
+            "simulated_tps": round(len(chain.transactions) / simulated_seconds, 1) if simulated_seconds else None,
+            "final_base_fee": chain.block_builder.base_fee,
+        },
+        "windows": windows,
+    }
+
+
+def compare(base_path: str, new_path: str):
+    """Print per-operation throughput and p99 changes of the last window"""
+    with open(base_path) as f:
+        base = json.load(f)["windows"][-1]["operations"]
+    with open(new_path) as f:
+        new = json.load(f)["windows"][-1]["operations"]
+    print(f"{'operation':<10} {'ops/s base':>12} {'ops/s new':>12} {'x':>6} "
+          f"{'p99 base':>10} {'p99 new':>10}")
+    for name in sorted(set(base) & set(new)):
+        b, n = base[name], new[name]
+        ratio = n["ops_per_sec"] / b["ops_per_sec"] if b["ops_per_sec"] else 0.0
+        print(f"{name:<10} {b['ops_per_sec']:>12.0f} {n['ops_per_sec']:>12.0f} {ratio:>6.2f} "
+              f"{b['p99_us']:>10.1f} {n['p99_us']:>10.1f}")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the MyModus mock Web3 service")
+    parser.add_argument("--ops", type=int, default=100000, help="total operations")
+    parser.add_argument("--window", type=int, default=10000, help="operations per report window")
+    parser.add_argument("--addresses", type=int, default=1000, help="simulated users")
+    parser.add_argument("--mix", help='operation weights, e.g. "mint=30,buy=10,history=20"')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-supply", type=int, help="override the NFT max_supply")
+    parser.add_argument("--block-time", type=float,
+                        help="pack transactions into blocks of this many simulated seconds")
+    parser.add_argument("--gas-limit", type=int, default=30000000, help="block gas limit")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="concurrent simulated users sharing one thread-safe service")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="measure live Python heap instead of peak RSS (slower)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.ops, args.window, args.addresses, parse_mix(args.mix), args.seed,
+                  args.max_supply, args.tracemalloc,
+                  block_time=args.block_time, gas_limit=args.gas_limit, threads=args.threads)
+    print(f"Finished {args.ops} operations in {results['total_seconds']}s")
+    chain = results["chain"]
+    print(f"Chain: {chain['blocks']} blocks, {chain['transactions_per_block']} txs/block, "
+          f"simulated {chain['simulated_tps']} tx/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
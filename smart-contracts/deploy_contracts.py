@@ -2,22 +2,49 @@
 """
 Smart Contract Deployment Script for MyModus
 Deploys MyModusNFT and MyModusLoyalty contracts to testnet
+
+Run without arguments for the interactive prompt, or script it:
+    PRIVATE_KEY=... INFURA_PROJECT_ID=... python deploy_contracts.py --networks sepolia,mumbai
+    python deploy_contracts.py --dry-run
 """
 
+import argparse
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
 from eth_account import Account
 import time
 
+# (abi, bytecode) per contract name, shared by every deployer in the process
+_ARTIFACT_CACHE = {}
+_ARTIFACT_LOCK = threading.Lock()
+
+class DeploymentError(Exception):
+    def __init__(self, message, contracts=None):
+        super().__init__(message)
+        # contracts that did get deployed before the failure
+        self.contracts = contracts or {}
+
 class ContractDeployer:
-    def __init__(self, config_file="contracts_config.json"):
+    def __init__(self, config_file="contracts_config.json", interactive=True):
+        self.config_file = config_file
+        self.interactive = interactive
         self.config = self.load_config(config_file)
         self.w3 = None
         self.account = None
+        self.network_name = None
         self.contracts = {}
-        
+
+    def fail(self, message, contracts=None):
+        """Exit in interactive mode, raise in scripted mode so other networks carry on"""
+        if self.interactive:
+            print(f"Error: {message}")
+            sys.exit(1)
+        raise DeploymentError(message, contracts)
+
     def load_config(self, config_file):
         """Load configuration from JSON file"""
         try:
@@ -26,192 +53,333 @@ class ContractDeployer:
         except FileNotFoundError:
             print(f"Error: {config_file} not found")
             sys.exit(1)
-            
+
+    def resolve_url(self, network_name):
+        """Network URL from <NETWORK>_URL, INFURA_PROJECT_ID or a prompt"""
+        network = self.config['networks'][network_name]
+        url = os.environ.get(f"{network_name.upper()}_URL") or network['url']
+
+        # Replace placeholder with actual Infura project ID
+        if 'YOUR_INFURA_PROJECT_ID' in url or '${INFURA_PROJECT_ID}' in url:
+            project_id = os.environ.get('INFURA_PROJECT_ID')
+            if not project_id:
+                if not self.interactive:
+                    self.fail(f"INFURA_PROJECT_ID is not set for {network_name}")
+                project_id = input("Enter your Infura Project ID: ").strip()
+            url = url.replace('YOUR_INFURA_PROJECT_ID', project_id).replace('${INFURA_PROJECT_ID}', project_id)
+        return url
+
     def connect_to_network(self, network_name):
         """Connect to specified network"""
         if network_name not in self.config['networks']:
-            print(f"Error: Network {network_name} not found in config")
-            sys.exit(1)
-            
+            self.fail(f"Network {network_name} not found in config")
+
         network = self.config['networks'][network_name]
-        url = network['url']
-        
-        # Replace placeholder with actual Infura project ID
-        if 'YOUR_INFURA_PROJECT_ID' in url:
-            project_id = input("Enter your Infura Project ID: ").strip()
-            url = url.replace('YOUR_INFURA_PROJECT_ID', project_id)
-            
+        url = self.resolve_url(network_name)
+
         try:
             self.w3 = Web3(Web3.HTTPProvider(url))
             if not self.w3.is_connected():
-                print(f"Error: Could not connect to {network_name}")
-                sys.exit(1)
-                
+                self.fail(f"Could not connect to {network_name}")
+
+            self.network_name = network_name
             print(f"Connected to {network_name} network")
             print(f"Chain ID: {network['chainId']}")
             print(f"Current block: {self.w3.eth.block_number}")
-            
+
+        except DeploymentError:
+            raise
         except Exception as e:
-            print(f"Error connecting to network: {e}")
-            sys.exit(1)
-            
+            self.fail(f"connecting to {network_name}: {e}")
+
+    def connect_dry_run(self):
+        """Connect to an in-process test chain instead of a real network"""
+        try:
+            self.w3 = Web3(Web3.EthereumTesterProvider())
+        except Exception as e:
+            self.fail(f"dry run needs eth-tester[py-evm] installed ({e})")
+        self.network_name = 'dry-run'
+        print("Connected to in-process test chain (dry run)")
+
     def setup_account(self):
         """Setup account for deployment"""
-        private_key = input("Enter your private key (without 0x): ").strip()
+        private_key = os.environ.get('PRIVATE_KEY', '').strip()
+        if not private_key:
+            if not self.interactive:
+                self.fail("PRIVATE_KEY is not set")
+            private_key = input("Enter your private key (without 0x): ").strip()
         if not private_key.startswith('0x'):
             private_key = '0x' + private_key
-            
+
         try:
             self.account = Account.from_key(private_key)
-            balance = self.w3.eth.get_balance(self.account.address)
-            balance_eth = self.w3.from_wei(balance, 'ether')
-            
-            print(f"Account: {self.account.address}")
-            print(f"Balance: {balance_eth} ETH")
-            
-            if balance_eth < 0.01:
-                print("Warning: Low balance for deployment")
-                
         except Exception as e:
-            print(f"Error setting up account: {e}")
-            sys.exit(1)
-            
+            self.fail(f"setting up account: {e}")
+
+        if self.network_name == 'dry-run':
+            # fund the deployer from one of the tester's unlocked accounts
+            self.w3.eth.send_transaction({
+                'from': self.w3.eth.accounts[0],
+                'to': self.account.address,
+                'value': self.w3.to_wei(100, 'ether')
+            })
+
+        balance = self.w3.eth.get_balance(self.account.address)
+        balance_eth = self.w3.from_wei(balance, 'ether')
+
+        print(f"Account: {self.account.address}")
+        print(f"Balance: {balance_eth} ETH")
+
+        if balance_eth < 0.01:
+            print("Warning: Low balance for deployment")
+
+    def load_artifact(self, contract_name):
+        """Load (abi, bytecode), preferring the Hardhat artifact; cached per process"""
+        with _ARTIFACT_LOCK:
+            if contract_name in _ARTIFACT_CACHE:
+                return _ARTIFACT_CACHE[contract_name]
+
+            abi, bytecode = None, None
+            artifact_path = f"artifacts/contracts/{contract_name}.sol/{contract_name}.json"
+            if os.path.exists(artifact_path):
+                with open(artifact_path, 'r') as f:
+                    artifact = json.load(f)
+                abi, bytecode = artifact['abi'], artifact.get('bytecode')
+            else:
+                try:
+                    with open(f"abi/{contract_name}.json", 'r') as f:
+                        abi_data = json.load(f)
+                    abi = abi_data['abi'] if isinstance(abi_data, dict) else abi_data
+                    bytecode = abi_data.get('bytecode') if isinstance(abi_data, dict) else None
+                except (FileNotFoundError, ValueError):
+                    pass
+
+            if not abi or not bytecode or bytecode == '0x':
+                print(f"Error: no ABI/bytecode for {contract_name}, run `npx hardhat compile` first")
+                return None, None
+            _ARTIFACT_CACHE[contract_name] = (abi, bytecode)
+            return abi, bytecode
+
     def load_contract_abi(self, contract_name):
         """Load contract ABI from file"""
-        try:
-            abi_path = f"abi/{contract_name}.json"
-            with open(abi_path, 'r') as f:
-                abi_data = json.load(f)
-                return abi_data['abi']
-        except FileNotFoundError:
-            print(f"Error: ABI file for {contract_name} not found")
-            return None
-            
-    def deploy_contract(self, contract_name, contract_class, *args):
-        """Deploy a contract"""
-        print(f"\nDeploying {contract_name}...")
-        
-        # Load contract ABI
-        abi = self.load_contract_abi(contract_name)
+        return self.load_artifact(contract_name)[0]
+
+    def deployment_plan(self):
+        """(contract name, constructor args) for every contract, in deploy order"""
+        loyalty = self.config['contractSettings']['MyModusLoyalty']
+        return [
+            ('MyModusNFT', []),
+            ('MyModusLoyalty', [
+                loyalty['name'],
+                loyalty['symbol'],
+                loyalty['decimals'],
+                int(loyalty['maxSupply']),
+                int(loyalty['mintPrice'])
+            ]),
+        ]
+
+    def send_deployment(self, contract_name, nonce, gas_price, *args):
+        """Sign and send one deployment with an explicit nonce, returns the tx hash"""
+        abi, bytecode = self.load_artifact(contract_name)
         if not abi:
-            return None
-            
-        # Create contract instance
-        contract = self.w3.eth.contract(abi=abi, bytecode=contract_class.bytecode)
-        
+            raise DeploymentError(f"No ABI/bytecode for {contract_name}, run `npx hardhat compile` first")
+
+        contract = self.w3.eth.contract(abi=abi, bytecode=bytecode)
+        constructor = contract.constructor(*args)
+
         # Build transaction
-        gas_estimate = contract.constructor(*args).estimate_gas({
-            'from': self.account.address,
-            'nonce': self.w3.eth.get_transaction_count(self.account.address)
-        })
-        
-        gas_limit = int(gas_estimate * 1.2)  # Add 20% buffer
-        
-        transaction = contract.constructor(*args).build_transaction({
+        gas_estimate = constructor.estimate_gas({'from': self.account.address})
+        max_gas = self.config['deployment']['gasLimit']
+        if gas_estimate > max_gas:
+            raise DeploymentError(f"{contract_name} needs {gas_estimate} gas, above the configured gasLimit {max_gas}")
+        gas_limit = min(int(gas_estimate * 1.2), max_gas)  # Add 20% buffer, never below the estimate
+
+        transaction = constructor.build_transaction({
             'from': self.account.address,
-            'nonce': self.w3.eth.get_transaction_count(self.account.address),
+            'nonce': nonce,
             'gas': gas_limit,
-            'gasPrice': self.w3.eth.gas_price
+            'gasPrice': gas_price
         })
-        
+
         # Sign and send transaction
-        signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        
-        print(f"Transaction sent: {tx_hash.hex()}")
-        print("Waiting for confirmation...")
-        
-        # Wait for confirmation
-        tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-        
+        signed_txn = self.account.sign_transaction(transaction)
+        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        print(f"[{self.network_name}] {contract_name} sent: {tx_hash.hex()} (nonce {nonce})")
+        return tx_hash
+
+    def wait_for_receipt(self, contract_name, tx_hash):
+        """Wait for a deployment receipt, returns the contract address"""
+        timeout = self.config['deployment'].get('timeout', 120000) / 1000
+        tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
         if tx_receipt.status == 1:
             contract_address = tx_receipt.contractAddress
-            print(f"✅ {contract_name} deployed successfully!")
-            print(f"Address: {contract_address}")
-            print(f"Gas used: {tx_receipt.gasUsed}")
+            print(f"✅ [{self.network_name}] {contract_name} deployed at {contract_address} "
+                  f"(gas used: {tx_receipt.gasUsed})")
             return contract_address
         else:
-            print(f"❌ {contract_name} deployment failed!")
-            return None
-            
+            raise DeploymentError(f"[{self.network_name}] {contract_name} deployment reverted (tx {tx_hash.hex()})")
+
+    def deploy_contract(self, contract_name, *args):
+        """Deploy a single contract and wait for it"""
+        print(f"\nDeploying {contract_name}...")
+        nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
+        try:
+            tx_hash = self.send_deployment(contract_name, nonce, self.w3.eth.gas_price, *args)
+            print("Waiting for confirmation...")
+            return self.wait_for_receipt(contract_name, tx_hash)
+        except DeploymentError as e:
+            self.fail(str(e))
+
     def update_config(self, network_name, contract_name, address):
         """Update configuration with deployed contract address"""
         self.config['networks'][network_name]['contracts'][contract_name]['address'] = address
-        
-        with open('contracts_config.json', 'w') as f:
+
+        with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=2)
-            
+
         print(f"Updated config with {contract_name} address")
-        
+
+    def deploy_pipelined(self):
+        """Send every deployment back-to-back, then wait for all receipts at once.
+
+        The nonce is read once and incremented locally, so no deployment waits
+        for the previous one to be mined. Any failure raises DeploymentError
+        after every sent deployment has been awaited; it carries the contracts
+        that did deploy.
+        """
+        nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
+        gas_price = self.w3.eth.gas_price
+
+        sent, errors = [], []
+        for contract_name, args in self.deployment_plan():
+            try:
+                tx_hash = self.send_deployment(contract_name, nonce, gas_price, *args)
+            except Exception as e:
+                # later transactions would be stuck behind the missing nonce
+                errors.append(f"{contract_name}: {e}")
+                break
+            sent.append((contract_name, tx_hash))
+            nonce += 1
+
+        print(f"[{self.network_name}] Waiting for {len(sent)} receipts...")
+        with ThreadPoolExecutor(max_workers=max(len(sent), 1)) as pool:
+            futures = {
+                contract_name: pool.submit(self.wait_for_receipt, contract_name, tx_hash)
+                for contract_name, tx_hash in sent
+            }
+            for contract_name, future in futures.items():
+                try:
+                    self.contracts[contract_name] = future.result()
+                except Exception as e:
+                    errors.append(f"{contract_name}: {e}")
+        if errors:
+            raise DeploymentError("; ".join(errors), dict(self.contracts))
+        return self.contracts
+
     def deploy_all_contracts(self, network_name):
         """Deploy all contracts to specified network"""
         print(f"\n🚀 Starting deployment to {network_name} network...")
-        
+
         # Connect to network
         self.connect_to_network(network_name)
-        
+
         # Setup account
         self.setup_account()
-        
-        # Deploy MyModusNFT
-        nft_settings = self.config['contractSettings']['MyModusNFT']
-        nft_address = self.deploy_contract(
-            'MyModusNFT',
-            MyModusNFT,  # This would need to be imported from compiled contracts
-            nft_settings['name'],
-            nft_settings['symbol'],
-            nft_settings['baseURI']
-        )
-        
-        if nft_address:
-            self.update_config(network_name, 'MyModusNFT', nft_address)
-            self.contracts['MyModusNFT'] = nft_address
-            
-        # Deploy MyModusLoyalty
-        loyalty_settings = self.config['contractSettings']['MyModusLoyalty']
-        loyalty_address = self.deploy_contract(
-            'MyModusLoyalty',
-            MyModusLoyalty,  # This would need to be imported from compiled contracts
-            loyalty_settings['name'],
-            loyalty_settings['symbol'],
-            loyalty_settings['decimals'],
-            loyalty_settings['initialSupply'],
-            loyalty_settings['mintPrice']
-        )
-        
-        if loyalty_address:
-            self.update_config(network_name, 'MyModusLoyalty', loyalty_address)
-            self.contracts['MyModusLoyalty'] = loyalty_address
-            
+
+        error = None
+        try:
+            self.deploy_pipelined()
+        except DeploymentError as e:
+            error = e  # record what did deploy before exiting
+        for name, address in self.contracts.items():
+            self.update_config(network_name, name, address)
+
         # Save deployment results
         deployment_results = {
             'network': network_name,
             'timestamp': int(time.time()),
             'contracts': self.contracts
         }
-        
+
         with open('deployment_results.json', 'w') as f:
             json.dump(deployment_results, f, indent=2)
-            
+
         print(f"\n📋 Deployment Summary:")
         print(f"Network: {network_name}")
         for name, address in self.contracts.items():
             print(f"{name}: {address}")
-            
+
         print(f"\nResults saved to deployment_results.json")
-        print(f"Configuration updated in contracts_config.json")
+        print(f"Configuration updated in {self.config_file}")
+        if error is not None:
+            self.fail(str(error))
 
-def main():
-    """Main deployment function"""
+def deploy_network(network_name, config_file, dry_run=False):
+    """Scripted deployment of every contract to one network"""
+    deployer = ContractDeployer(config_file, interactive=False)
+    if dry_run:
+        deployer.connect_dry_run()
+    else:
+        deployer.connect_to_network(network_name)
+    deployer.setup_account()
+    return deployer.deploy_pipelined()
+
+def deploy_networks(network_names, config_file="contracts_config.json", dry_run=False):
+    """Deploy to several networks in parallel, then record all addresses in one write"""
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=len(network_names)) as pool:
+        futures = {
+            name: pool.submit(deploy_network, name, config_file, dry_run)
+            for name in network_names
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+                print(f"❌ [{name}] {e}")
+                # keep whatever did deploy so its address is still recorded
+                if getattr(e, 'contracts', None):
+                    results[name] = e.contracts
+
+    if dry_run:
+        print("\nDry run finished, config left untouched")
+        return results, errors
+
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    for network_name, contracts in results.items():
+        for contract_name, address in contracts.items():
+            config['networks'][network_name]['contracts'][contract_name]['address'] = address
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=2)
+
+    with open('deployment_results.json', 'w') as f:
+        json.dump({
+            'timestamp': int(time.time()),
+            'networks': results,
+            'errors': errors
+        }, f, indent=2)
+
+    print("\n📋 Deployment Summary:")
+    for network_name, contracts in results.items():
+        for name, address in contracts.items():
+            print(f"{network_name} {name}: {address}")
+    print("\nResults saved to deployment_results.json")
+    return results, errors
+
+def interactive_main():
+    """Prompt for a network and deploy to it"""
     print("🚀 MyModus Smart Contract Deployer")
     print("=" * 40)
-    
+
     # Available networks
     networks = ['hardhat', 'ganache', 'sepolia', 'mumbai']
     print("\nAvailable networks:")
     for i, network in enumerate(networks, 1):
         print(f"{i}. {network}")
-        
+
     # Get network choice
     while True:
         try:
@@ -223,14 +391,36 @@ def main():
                 print("Invalid choice. Please select 1-4.")
         except ValueError:
             print("Please enter a number.")
-            
+
     print(f"\nSelected network: {selected_network}")
-    
+
     # Initialize deployer
     deployer = ContractDeployer()
-    
+
     # Deploy contracts
     deployer.deploy_all_contracts(selected_network)
 
+def main():
+    """Main deployment function"""
+    parser = argparse.ArgumentParser(description="Deploy MyModus contracts")
+    parser.add_argument('--networks', default=os.environ.get('DEPLOYMENT_NETWORKS') or os.environ.get('DEPLOYMENT_NETWORK'),
+                        help="comma-separated networks, deploys non-interactively")
+    parser.add_argument('--config', default='contracts_config.json')
+    parser.add_argument('--dry-run', action='store_true',
+                        help="deploy to an in-process test chain (needs eth-tester[py-evm])")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        if not os.environ.get('PRIVATE_KEY'):
+            os.environ['PRIVATE_KEY'] = os.environ.get('TEST_PRIVATE_KEY', Account.create().key.hex())
+        _, errors = deploy_networks(['dry-run'], args.config, dry_run=True)
+    elif args.networks:
+        names = [name.strip() for name in args.networks.split(',') if name.strip()]
+        _, errors = deploy_networks(names, args.config)
+    else:
+        interactive_main()
+        return
+    sys.exit(1 if errors else 0)
+
 if __name__ == "__main__":
     main()
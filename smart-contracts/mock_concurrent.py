@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Thread-safe and asyncio front ends for the MyModus mock chain
+MockWeb3Service itself is single-threaded: contract calls are check-then-act
+sequences over shared balances, owner sets and the order book. These wrappers
+let many threads or coroutines drive one service without double-spends.
+
+    service = ConcurrentWeb3Service()
+    service.transfer_loyalty_tokens(a, b, "1")   # safe from any thread
+
+    chain = AsyncMockWeb3Service()
+    await chain.buy_nft(token_id, buyer, price)   # awaitable from asyncio
+"""
+
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from mock_contracts import MockWeb3Service
+
+# MockWeb3Service methods that change chain state; everything else is a read
+WRITE_METHODS = frozenset({
+    "mint_nft",
+    "batch_mint_nfts",
+    "list_nft_for_sale",
+    "unlist_nft",
+    "buy_nft",
+    "create_loyalty_tokens",
+    "transfer_loyalty_tokens",
+    "burn_loyalty_tokens",
+    "airdrop_loyalty_tokens",
+    "batch_transfer_loyalty_tokens",
+    "configure_blocks",
+    "seal_block",
+    "mine",
+    "mine_due",
+})
+
+# read-only methods exposed by the wrappers; contract objects, indexes and the
+# internal record/commit/log helpers are deliberately not passed through
+READ_METHODS = frozenset({
+    "connect_wallet",
+    "get_balance",
+    "get_block",
+    "get_transaction_count",
+    "get_user_nfts",
+    "get_nfts_for_sale",
+    "get_nfts_for_sale_page",
+    "get_nfts_by_traits",
+    "get_loyalty_balance",
+    "get_transaction_history",
+    "get_transaction_history_page",
+    "get_transaction",
+    "get_transaction_block",
+    "get_transaction_receipt",
+    "get_logs",
+    "get_contract_addresses",
+    "get_network_info",
+    "export_state",
+})
+
+# read-only properties, read under the lock like READ_METHODS
+READ_PROPERTIES = frozenset({"gas_price"})
+
+_STOP = object()
+
+
+class ReadWriteLock:
+    """Shared lock for readers, exclusive for the writer.
+
+    A waiting writer blocks new readers, so a steady stream of reads cannot
+    starve the writer thread.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class ConcurrentWeb3Service:
+    """MockWeb3Service that can be shared between threads.
+
+    State-changing calls are queued to a single writer thread and applied in
+    submission order, the way a sequencer orders a mempool, so there is no
+    lock ordering to get wrong and no partially applied transfer is ever
+    visible. The writer drains everything queued since its last wake-up and
+    applies it as one batch (up to max_batch calls), so under load many
+    callers share one thread hand-off instead of each paying for it.
+
+    Reads run on the caller's thread under a shared lock and wait only for
+    the batch currently being applied, not for the write queue. Only the
+    methods in WRITE_METHODS and READ_METHODS are exposed as attributes;
+    code that needs the contracts themselves uses `service` inside
+    `lock.read()`.
+    """
+
+    def __init__(self, service: Optional[MockWeb3Service] = None, max_batch: int = 64):
+        self.service = service if service is not None else MockWeb3Service()
+        self.max_batch = max_batch
+        self.lock = ReadWriteLock()
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="mock-chain-writer", daemon=True)
+        self._writer.start()
+
+    def submit(self, method: str, *args) -> Future:
+        """Queue a state-changing call, returns a Future for its result"""
+        if method not in WRITE_METHODS:
+            raise Exception(f"Not a write method: {method}")
+        if self._closed:
+            raise Exception("Service is closed")
+        future = Future()
+        self._queue.put((method, args, future))
+        return future
+
+    def call(self, method: str, *args) -> Any:
+        """Apply a state-changing call and wait for its result"""
+        return self.submit(method, *args).result()
+
+    def read(self, method: str, *args, **kwargs) -> Any:
+        """Run a read-only service method against a consistent state"""
+        if method not in READ_METHODS:
+            raise Exception(f"Not a read method: {method}")
+        with self.lock.read():
+            return getattr(self.service, method)(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name in WRITE_METHODS:
+            return functools.partial(self.call, name)
+        if name in READ_METHODS:
+            return functools.partial(self.read, name)
+        if name in READ_PROPERTIES:
+            with self.lock.read():
+                return getattr(self.service, name)
+        raise AttributeError(f"{type(self).__name__} does not expose {name!r}")
+
+    def close(self):
+        """Apply everything already queued, then stop the writer thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def __enter__(self) -> "ConcurrentWeb3Service":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            done = []
+            with self.lock.write():
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                        continue
+                    method, args, future = item
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        done.append((future, getattr(self.service, method)(*args), None))
+                    except BaseException as e:
+                        done.append((future, None, e))
+            self.batches += 1
+            self.writes += len(done)
+            # wake callers only after the lock is released so their reads do not block
+            for future, result, error in done:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+            if stop:
+                return
+
+
+class AsyncMockWeb3Service:
+    """Awaitable facade over ConcurrentWeb3Service for asyncio code.
+
+    Writes are awaited without blocking the event loop; all coroutines
+    submitting in the same loop iteration usually land in one writer batch.
+    Reads run in the default executor, since taking the read lock can wait
+    for a whole writer batch.
+    """
+
+    def __init__(self, service: Optional[ConcurrentWeb3Service] = None):
+        self.concurrent = service if service is not None else ConcurrentWeb3Service()
+
+    @property
+    def service(self) -> MockWeb3Service:
+        return self.concurrent.service
+
+    async def call(self, method: str, *args) -> Any:
+        return await asyncio.wrap_future(self.concurrent.submit(method, *args))
+
+    async def read(self, method: str, *args, **kwargs) -> Any:
+        return await asyncio.to_thread(self.concurrent.read, method, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name in WRITE_METHODS:
+            return functools.partial(self.call, name)
+        if name in READ_METHODS:
+            return functools.partial(self.read, name)
+        raise AttributeError(f"{type(self).__name__} does not expose {name!r}")
+
+    def close(self):
+        self.concurrent.close()
+
+    async def __aenter__(self) -> "AsyncMockWeb3Service":
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.close)
@@ -4,12 +4,25 @@ Mock Smart Contracts for MyModus Web3 Testing
 This script provides mock contract functionality for testing without actual deployment
 """
 
+import copy
+import hashlib
 import json
+import sys
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+from itertools import repeat
+from dataclasses import dataclass, asdict, field, fields
 from datetime import datetime
 
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+NFT_CONTRACT_ADDRESS = "0x1234567890123456789012345678901234567890"
+LOYALTY_CONTRACT_ADDRESS = "0x0987654321098765432109876543210987654321"
+
 @dataclass
 class NFTMetadata:
     name: str
@@ -44,6 +57,558 @@ class Transaction:
     status: str
     contract_address: Optional[str] = None
     method: Optional[str] = None
+    events: List[Dict[str, str]] = field(default_factory=list)
+    transaction_index: int = 0
+    nonce: int = 0
+    cumulative_gas_used: int = 0  # gas used in the block up to and including this tx
+
+@dataclass
+class Block:
+    number: int
+    hash: str
+    parent_hash: str
+    timestamp: float
+    gas_limit: int
+    gas_used: int
+    base_fee: int
+    first_transaction: int  # sequence of the block's first transaction
+    transaction_count: int
+
+@dataclass
+class EventLog:
+    address: str
+    event: str
+    args: Dict[str, str]
+    block_number: int
+    transaction_hash: str
+    log_index: int
+
+TRANSACTION_FIELDS = tuple(f.name for f in fields(Transaction))
+BLOCK_FIELDS = tuple(f.name for f in fields(Block))
+
+# (base gas, gas per item) per contract method; items are attributes for
+# NFT mints and recipients/transfers for batch calls
+GAS_SCHEDULE = {
+    NFT_CONTRACT_ADDRESS: {
+        "mint": (150000, 20000),
+        "batchMint": (60000, 110000),
+        "putForSale": (60000, 0),
+        "removeFromSale": (30000, 0),
+        "buyNFT": (90000, 0),
+    },
+    LOYALTY_CONTRACT_ADDRESS: {
+        "mint": (100000, 0),
+        "transfer": (65000, 0),
+        "burn": (40000, 0),
+        "batchMint": (50000, 30000),
+        "batchTransfer": (50000, 35000),
+    },
+}
+
+# Event arguments holding addresses, used to index transactions by party
+ADDRESS_ARGS = ("from", "to", "seller", "buyer", "creator", "user")
+
+class EventIndex:
+    """Block-ordered event log with per-block bloom filters.
+    
+    Events live only in Transaction.events; the index keeps, per log, the
+    sequence of its transaction and the event's position in it, and builds
+    EventLog objects only for query results. Blocks are indexed per event
+    name, and blocks with at least BLOOM_MIN_LOGS logs get a 2048-bit bloom
+    over their contract addresses, event names and "arg=value" pairs so
+    range queries can skip blocks that cannot match. Blooms are computed by
+    the first query that reaches a block and reset when the block grows, so
+    recording transactions never pays for them. Smaller blocks (every block
+    in one-tx-per-block mode) are scanned directly, which is as cheap as
+    testing a filter.
+    """
+    
+    BLOOM_BITS = 2048
+    BLOOM_MIN_LOGS = 8
+    
+    def __init__(self, transactions: List[Transaction]):
+        self.transactions = transactions
+        self.log_txs = array("q")     # transaction sequence of each log
+        self.log_events = array("l")  # position of the event in tx.events
+        self.blocks: List[int] = []        # ascending block numbers with logs
+        self.block_starts: List[int] = []  # position of each block's first log
+        self.blooms: List[Optional[int]] = []  # None until a query needs the block's filter
+        self.event_blocks: Dict[str, List[int]] = {}  # event -> positions in self.blocks
+        
+    def __len__(self) -> int:
+        return len(self.log_txs)
+        
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def bloom_bits(value: str) -> int:
+        # Ethereum-style: three 11-bit indexes taken from the digest
+        digest = hashlib.sha256(value.encode("utf-8")).digest()
+        bits = 0
+        for i in (0, 2, 4):
+            bits |= 1 << (((digest[i] << 8) | digest[i + 1]) % EventIndex.BLOOM_BITS)
+        return bits
+        
+    def add(self, seq: int, tx: Transaction):
+        """Index the events of the recorded transaction at seq; blocks must not go backwards"""
+        if not tx.events:
+            return
+        block = tx.block_number
+        if not self.blocks or self.blocks[-1] != block:
+            if self.blocks and block < self.blocks[-1]:
+                raise Exception("Logs must be added in block order")
+            self.blocks.append(block)
+            self.block_starts.append(len(self.log_txs))
+            self.blooms.append(None)
+        block_pos = len(self.blocks) - 1
+        for name in {event["event"] for event in tx.events}:
+            positions = self.event_blocks.setdefault(name, [])
+            if not positions or positions[-1] != block_pos:
+                positions.append(block_pos)
+        count = len(tx.events)
+        self.log_txs.extend(repeat(seq, count))
+        self.log_events.extend(range(count))
+        self.blooms[block_pos] = None
+        
+    def block_bloom(self, pos: int) -> Optional[int]:
+        """Bloom of the block at pos, None for blocks too small to need one"""
+        bloom = self.blooms[pos]
+        if bloom is None:
+            start = self.block_starts[pos]
+            end = self.block_starts[pos + 1] if pos + 1 < len(self.blocks) else len(self.log_txs)
+            if end - start < self.BLOOM_MIN_LOGS:
+                return None
+            bloom = self.blooms[pos] = self.logs_bloom(start, end)
+        return bloom
+        
+    def logs_bloom(self, start: int, end: int) -> int:
+        bloom_bits = self.bloom_bits
+        transactions = self.transactions
+        bloom = 0
+        last_seq = -1
+        for i in range(start, end):
+            seq = self.log_txs[i]
+            tx = transactions[seq]
+            if seq != last_seq:
+                bloom |= bloom_bits(tx.contract_address)
+                last_seq = seq
+            for key, value in tx.events[self.log_events[i]].items():
+                # the event name is hashed bare, arguments as "arg=value"
+                bloom |= bloom_bits(value if key == "event" else f"{key}={value}")
+        return bloom
+        
+    def query(self, from_block: Optional[int] = None, to_block: Optional[int] = None,
+              addresses: Optional[List[str]] = None, events: Optional[List[str]] = None,
+              args: Optional[Dict[str, str]] = None, limit: Optional[int] = None) -> List[EventLog]:
+        """Logs in [from_block, to_block] matching any address, any event and all args"""
+        lo = 0 if from_block is None else bisect_left(self.blocks, from_block)
+        hi = len(self.blocks) if to_block is None else bisect_right(self.blocks, to_block)
+        if lo >= hi:
+            return []
+            
+        if events:
+            # only visit blocks that emitted one of the events
+            candidates = set()
+            for event in events:
+                positions = self.event_blocks.get(event, [])
+                candidates.update(positions[bisect_left(positions, lo):bisect_left(positions, hi)])
+            block_positions = sorted(candidates)
+        else:
+            block_positions = range(lo, hi)
+            
+        address_blooms = [self.bloom_bits(a) for a in addresses] if addresses else None
+        event_blooms = [self.bloom_bits(e) for e in events] if events else None
+        args_bloom = 0
+        for key, value in (args or {}).items():
+            args_bloom |= self.bloom_bits(f"{key}={value}")
+        address_set = set(addresses) if addresses else None
+        event_set = set(events) if events else None
+        
+        transactions = self.transactions
+        result = []
+        for pos in block_positions:
+            bloom = self.block_bloom(pos)
+            if bloom is not None:
+                if bloom & args_bloom != args_bloom:
+                    continue
+                if address_blooms and not any(bloom & b == b for b in address_blooms):
+                    continue
+                if event_blooms and not any(bloom & b == b for b in event_blooms):
+                    continue
+            start = self.block_starts[pos]
+            end = self.block_starts[pos + 1] if pos + 1 < len(self.blocks) else len(self.log_txs)
+            for i in range(start, end):
+                tx = transactions[self.log_txs[i]]
+                if address_set is not None and tx.contract_address not in address_set:
+                    continue
+                event = tx.events[self.log_events[i]]
+                if event_set is not None and event["event"] not in event_set:
+                    continue
+                if args and any(k == "event" or event.get(k) != v for k, v in args.items()):
+                    continue
+                result.append(EventLog(
+                    address=tx.contract_address,
+                    event=event["event"],
+                    args={k: v for k, v in event.items() if k != "event"},
+                    block_number=tx.block_number,
+                    transaction_hash=tx.hash,
+                    log_index=i - start
+                ))
+                if limit is not None and len(result) >= limit:
+                    return result
+        return result
+        
+    def export_state(self) -> Dict:
+        return {
+            "log_txs": self.log_txs.tobytes(),
+            "log_events": self.log_events.tobytes(),
+            "blocks": self.blocks,
+            "block_starts": self.block_starts,
+            "blooms": self.blooms,
+            "event_blocks": self.event_blocks,
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict, transactions: List[Transaction]) -> "EventIndex":
+        index = cls(transactions)
+        index.log_txs.frombytes(state["log_txs"])
+        index.log_events.frombytes(state["log_events"])
+        index.blocks = state["blocks"]
+        index.block_starts = state["block_starts"]
+        index.blooms = state["blooms"]
+        index.event_blocks = state["event_blocks"]
+        return index
+
+def transaction_to_dict(tx: Transaction, events: Optional[List[Dict[str, str]]] = None) -> Dict:
+    """asdict() for transactions without its recursive deep copy.
+    
+    Batch transactions can carry thousands of events, and deep-copying them
+    dominated history reads. Pass events to return only that subset;
+    eventCount always counts all of the transaction's events.
+    """
+    data = {name: getattr(tx, name) for name in TRANSACTION_FIELDS}
+    data["events"] = [dict(event) for event in (tx.events if events is None else events)]
+    data["eventCount"] = len(tx.events)
+    return data
+
+# transactions with at least this many events get a cached per-address event map
+EVENT_PARTIES_MIN_EVENTS = 64
+
+def events_by_party(events: List[Dict[str, str]]) -> Dict[str, List[int]]:
+    """Map each address named in events to the positions of its events"""
+    parties: Dict[str, List[int]] = {}
+    for i, event in enumerate(events):
+        for key in ADDRESS_ARGS:
+            address = event.get(key)
+            if address is not None:
+                positions = parties.setdefault(address, [])
+                if not positions or positions[-1] != i:
+                    positions.append(i)
+    return parties
+
+def transaction_hash(sender: str, nonce: int, contract_address: str, to_address: str,
+                     method: str, value: str, events: List[Dict[str, str]]) -> str:
+    """Deterministic 32-byte hash of a transaction's content and sender nonce.
+    
+    SHA3-256 stands in for Ethereum's keccak256, which hashlib does not ship.
+    (sender, nonce) never repeats, so hashes are unique and identical across
+    runs and replays of the same operations.
+    """
+    payload = repr((sender, nonce, contract_address, to_address, method, value, events))
+    return "0x" + hashlib.sha3_256(payload.encode("utf-8")).hexdigest()
+
+class OrderBook:
+    """Sorted index of listed NFTs keyed by (price in wei, token_id)"""
+    
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []
+        self._prices: Dict[int, int] = {}
+        
+    def __len__(self) -> int:
+        return len(self._keys)
+        
+    def __contains__(self, token_id: int) -> bool:
+        return token_id in self._prices
+        
+    def __getitem__(self, token_id: int) -> int:
+        return self._prices[token_id]
+        
+    def __iter__(self):
+        return (token_id for _, token_id in self._keys)
+        
+    def keys(self):
+        return iter(self)
+        
+    def add(self, token_id: int, price: int):
+        """List a token, replacing any previous price"""
+        if token_id in self._prices:
+            self.remove(token_id)
+        self._prices[token_id] = price
+        insort(self._keys, (price, token_id))
+        
+    def remove(self, token_id: int):
+        """Delist a token if it is listed"""
+        price = self._prices.pop(token_id, None)
+        if price is None:
+            return
+        i = bisect_left(self._keys, (price, token_id))
+        del self._keys[i]
+        
+    def cheapest(self, count: int = 1) -> List[int]:
+        return [token_id for _, token_id in self._keys[:count]]
+        
+    def most_expensive(self, count: int = 1) -> List[int]:
+        return [token_id for _, token_id in reversed(self._keys[-count:])] if count > 0 else []
+        
+    def page(self, min_price: Optional[int] = None, max_price: Optional[int] = None,
+             cursor: Optional[str] = None, limit: int = 50,
+             descending: bool = False) -> Tuple[List[int], Optional[str]]:
+        """Return token ids in price order and the cursor for the next page"""
+        if limit < 1:
+            raise Exception("Invalid limit")
+        lo = 0 if min_price is None else bisect_left(self._keys, (min_price, -1))
+        hi = len(self._keys) if max_price is None else bisect_right(self._keys, (max_price, float("inf")))
+        if cursor:
+            after = self.decode_cursor(cursor)
+            if descending:
+                hi = min(hi, bisect_left(self._keys, after))
+            else:
+                lo = max(lo, bisect_right(self._keys, after))
+        if descending:
+            start = max(lo, hi - limit)
+            keys = self._keys[start:hi][::-1]
+            has_more = start > lo
+        else:
+            end = min(hi, lo + limit)
+            keys = self._keys[lo:end]
+            has_more = end < hi
+        next_cursor = self.encode_cursor(keys[-1]) if keys and has_more else None
+        return [token_id for _, token_id in keys], next_cursor
+        
+    def export_state(self) -> List[Tuple[int, int]]:
+        return list(self._keys)
+        
+    @classmethod
+    def from_state(cls, keys: List[Tuple[int, int]]) -> "OrderBook":
+        book = cls()
+        book._keys = list(keys)
+        book._prices = {token_id: price for price, token_id in book._keys}
+        return book
+        
+    @staticmethod
+    def encode_cursor(key: Tuple[int, int]) -> str:
+        return f"{key[0]}:{key[1]}"
+        
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, int]:
+        try:
+            price, token_id = cursor.split(":")
+            return int(price), int(token_id)
+        except ValueError:
+            raise Exception("Invalid cursor")
+
+class NFTStore:
+    """Columnar storage for minted NFTs.
+    
+    Token ids are dense and start at 1, so every field is a column indexed by
+    token_id - 1. Attribute dicts are interned: each distinct attribute gets
+    one id and each distinct attribute combination one shared tuple, so a
+    trait repeated across a collection is stored once. An inverted index maps
+    (trait_type, value) to the ascending token ids carrying it.
+    NFTMetadata objects are built on read and are detached copies.
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.images: List[str] = []
+        self.owners: List[str] = []
+        self.mint_times = array("d")
+        self.prices: List[Optional[int]] = []
+        self.attributes: List[Tuple[int, ...]] = []
+        # attribute id -> attribute items with their original values, and the
+        # reverse lookup keyed by attribute_key()
+        self.attribute_table: List[Tuple[Tuple[str, Any], ...]] = []
+        self.attribute_ids: Dict[Tuple, int] = {}
+        # attribute id -> (trait_type, value), None when the dict has no trait
+        self.attribute_traits: List[Optional[Tuple[str, str]]] = []
+        self.attribute_sets: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self.trait_index: Dict[Tuple[str, str], List[int]] = {}
+        
+    def __len__(self) -> int:
+        return len(self.names)
+        
+    def __contains__(self, token_id: int) -> bool:
+        return isinstance(token_id, int) and 0 < token_id <= len(self.names)
+        
+    def __getitem__(self, token_id: int) -> NFTMetadata:
+        if token_id not in self:
+            raise KeyError(token_id)
+        return self._build(token_id)
+        
+    def get(self, token_id: int) -> Optional[NFTMetadata]:
+        return self._build(token_id) if token_id in self else None
+        
+    def append(self, name: str, description: str, image: str,
+               attributes: List[Dict[str, str]], owner: str, mint_time: float) -> int:
+        """Store a new token and index its traits, returns the token id"""
+        # validate first: a failure halfway through would leave the columns misaligned
+        self.check(name, description, image, attributes, owner)
+        token_id = len(self.names) + 1
+        attr_ids = tuple(self._intern_attribute(attr) for attr in attributes)
+        attr_ids = self.attribute_sets.setdefault(attr_ids, attr_ids)
+        
+        self.names.append(sys.intern(name))
+        self.descriptions.append(sys.intern(description))
+        self.images.append(image)
+        self.owners.append(sys.intern(owner))
+        self.mint_times.append(mint_time)
+        self.prices.append(None)
+        self.attributes.append(attr_ids)
+        
+        for attr_id in attr_ids:
+            trait = self.attribute_traits[attr_id]
+            if trait is not None:
+                postings = self.trait_index.setdefault(trait, [])
+                # a token listing the same trait twice is indexed once
+                if not postings or postings[-1] != token_id:
+                    postings.append(token_id)
+        return token_id
+        
+    @staticmethod
+    def check(name: str, description: str, image: str,
+              attributes: List[Dict[str, str]], owner: str):
+        """Raise if a token with these fields cannot be stored"""
+        for field, value in (("name", name), ("description", description),
+                             ("image", image), ("owner", owner)):
+            if not isinstance(value, str):
+                raise Exception(f"Invalid {field}")
+        if not isinstance(attributes, (list, tuple)) \
+                or not all(isinstance(attr, dict) for attr in attributes):
+            raise Exception("Invalid attributes")
+        
+    def owner_of(self, token_id: int) -> str:
+        return self.owners[token_id - 1]
+        
+    def set_owner(self, token_id: int, owner: str):
+        self.owners[token_id - 1] = sys.intern(owner)
+        
+    def set_price(self, token_id: int, price: Optional[int]):
+        self.prices[token_id - 1] = price
+        
+    def find_by_traits(self, traits: List[Tuple[str, str]], after: int = 0,
+                       limit: Optional[int] = None) -> List[int]:
+        """Token ids carrying every (trait_type, value) pair, ascending"""
+        if not traits:
+            return []
+        postings = []
+        # the index keys values by str(), see _intern_attribute
+        for trait in {(str(trait_type), str(value)) for trait_type, value in traits}:
+            ids = self.trait_index.get(trait)
+            if not ids:
+                return []
+            postings.append((trait, ids))
+        postings.sort(key=lambda item: len(item[1]))
+        
+        # walk the shortest posting list and check the rest per token
+        _, candidates = postings[0]
+        required = {trait for trait, _ in postings[1:]}
+        start = bisect_right(candidates, after)
+        result = []
+        for token_id in candidates[start:]:
+            if required:
+                token_traits = {self.attribute_traits[a] for a in self.attributes[token_id - 1]}
+                if not required <= token_traits:
+                    continue
+            result.append(token_id)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+        
+    def trait_counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of tokens per (trait_type, value)"""
+        return {trait: len(ids) for trait, ids in self.trait_index.items()}
+        
+    def export_state(self) -> Dict:
+        return {
+            "names": self.names,
+            "descriptions": self.descriptions,
+            "images": self.images,
+            "owners": self.owners,
+            "mint_times": self.mint_times.tobytes(),
+            "prices": self.prices,
+            "attributes": self.attributes,
+            "attribute_table": self.attribute_table,
+            "attribute_traits": self.attribute_traits,
+            "trait_index": self.trait_index,
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict) -> "NFTStore":
+        store = cls()
+        store.names = state["names"]
+        store.descriptions = state["descriptions"]
+        store.images = state["images"]
+        store.owners = state["owners"]
+        store.mint_times.frombytes(state["mint_times"])
+        store.prices = state["prices"]
+        store.attribute_table = state["attribute_table"]
+        store.attribute_traits = state["attribute_traits"]
+        store.trait_index = state["trait_index"]
+        store.attribute_ids = {
+            cls.attribute_key(items): i for i, items in enumerate(store.attribute_table)
+        }
+        # re-share identical attribute tuples between tokens
+        sets = store.attribute_sets
+        store.attributes = [sets.setdefault(attrs, attrs) for attrs in state["attributes"]]
+        return store
+        
+    @staticmethod
+    def attribute_key(items: Tuple[Tuple[str, Any], ...]) -> Tuple:
+        """Hashable identity of attribute items; 5, "5" and True stay distinct"""
+        try:
+            key = tuple((k, type(v).__name__, v) for k, v in items)
+            hash(key)
+        except TypeError:  # list or dict values
+            key = tuple((k, type(v).__name__, json.dumps(v, sort_keys=True)) for k, v in items)
+        return key
+        
+    def _intern_attribute(self, attribute: Dict[str, Any]) -> int:
+        items = tuple(sorted(
+            ((sys.intern(str(k)), sys.intern(v) if type(v) is str else v)
+             for k, v in attribute.items()),
+            key=lambda item: item[0]
+        ))
+        key = self.attribute_key(items)
+        attr_id = self.attribute_ids.get(key)
+        if attr_id is None:
+            attr_id = len(self.attribute_table)
+            self.attribute_ids[key] = attr_id
+            self.attribute_table.append(items)
+            if "trait_type" in attribute and "value" in attribute:
+                trait = (sys.intern(str(attribute["trait_type"])), sys.intern(str(attribute["value"])))
+            else:
+                trait = None
+            self.attribute_traits.append(trait)
+        return attr_id
+        
+    def _build(self, token_id: int) -> NFTMetadata:
+        i = token_id - 1
+        price = self.prices[i]
+        return NFTMetadata(
+            name=self.names[i],
+            description=self.descriptions[i],
+            image=self.images[i],
+            attributes=[
+                {k: copy.deepcopy(v) if isinstance(v, (list, dict)) else v
+                 for k, v in self.attribute_table[a]}
+                for a in self.attributes[i]
+            ],
+            token_id=token_id,
+            owner=self.owners[i],
+            mint_date=datetime.fromtimestamp(self.mint_times[i]).isoformat(),
+            price=None if price is None else str(price),
+            is_for_sale=price is not None
+        )
 
 class MockMyModusNFT:
     """Mock implementation of MyModusNFT contract"""
@@ -51,110 +616,110 @@ class MockMyModusNFT:
     def __init__(self):
         self.name = "MyModus NFT Collection"
         self.symbol = "MMNFT"
+        self.address = NFT_CONTRACT_ADDRESS
         self.base_uri = "ipfs://"
         self.total_supply = 0
         self.max_supply = 10000
         self.mint_price = "100000000000000000"  # 0.1 ETH
-        self.nfts: Dict[int, NFTMetadata] = {}
-        self.owners: Dict[str, List[int]] = {}
-        self.for_sale: Dict[int, str] = {}  # token_id -> price
+        self.nfts = NFTStore()
+        self.owners: Dict[str, Set[int]] = {}
+        self.for_sale = OrderBook()  # token_id -> price in wei
+        # events emitted since MockWeb3Service last collected them
+        self.emitted: List[Dict[str, str]] = []
         
     def mint(self, to_address: str, name: str, description: str, image: str, 
-             attributes: List[Dict[str, str]]) -> Tuple[int, str]:
-        """Mint a new NFT"""
+             attributes: List[Dict[str, str]]) -> int:
+        """Mint a new NFT, returns its token ID"""
         if self.total_supply >= self.max_supply:
             raise Exception("Max supply reached")
             
-        token_id = self.total_supply + 1
-        self.total_supply += 1
-        
-        # Create NFT metadata
-        nft = NFTMetadata(
-            name=name,
-            description=description,
-            image=image,
-            attributes=attributes,
-            token_id=token_id,
-            owner=to_address,
-            mint_date=datetime.now().isoformat(),
-            price=None,
-            is_for_sale=False
+        # Store NFT metadata
+        token_id = self.nfts.append(
+            name, description, image, attributes, to_address, time.time()
         )
-        
-        self.nfts[token_id] = nft
+        self.total_supply += 1
         
         # Update owner's NFT list
-        if to_address not in self.owners:
-            self.owners[to_address] = []
-        self.owners[to_address].append(token_id)
+        self.owners.setdefault(to_address, set()).add(token_id)
+        self.emit("Transfer", **{"from": ZERO_ADDRESS, "to": to_address, "tokenId": str(token_id)})
+        self.emit("NFTMinted", tokenId=str(token_id), creator=to_address)
+        return token_id
         
-        # Generate mock transaction hash
-        tx_hash = f"0x{token_id:064x}"
+    def batch_mint(self, mints: List[Tuple[str, str, str, str, List[Dict[str, str]]]]) -> List[int]:
+        """Mint many NFTs at once, returns their token IDs.
         
-        return token_id, tx_hash
+        Each entry is (to_address, name, description, image, attributes).
+        The supply and every entry are checked before the first mint, so
+        either every token is minted or none is.
+        """
+        if self.total_supply + len(mints) > self.max_supply:
+            raise Exception("Max supply reached")
+            
+        for mint in mints:
+            if not isinstance(mint, (list, tuple)) or len(mint) != 5:
+                raise Exception("Invalid mint entry")
+            to_address, name, description, image, attributes = mint
+            self.nfts.check(name, description, image, attributes, to_address)
+            
+        return [self.mint(*mint) for mint in mints]
         
-    def put_for_sale(self, token_id: int, price: str, seller: str) -> str:
+    def put_for_sale(self, token_id: int, price: str, seller: str):
         """Put NFT for sale"""
         if token_id not in self.nfts:
             raise Exception("NFT does not exist")
             
-        nft = self.nfts[token_id]
-        if nft.owner != seller:
+        if self.nfts.owner_of(token_id) != seller:
             raise Exception("Not the owner")
             
-        nft.price = price
-        nft.is_for_sale = True
-        self.for_sale[token_id] = price
-        
-        # Generate mock transaction hash
-        tx_hash = f"0x{token_id:064x}_sale"
-        return tx_hash
+        price_wei = self._parse_price(price)
+        self.nfts.set_price(token_id, price_wei)
+        self.for_sale.add(token_id, price_wei)
+        self.emit("NFTPutForSale", tokenId=str(token_id), price=str(price_wei))
         
-    def remove_from_sale(self, token_id: int, seller: str) -> str:
+    def remove_from_sale(self, token_id: int, seller: str):
         """Remove NFT from sale"""
         if token_id not in self.nfts:
             raise Exception("NFT does not exist")
             
-        nft = self.nfts[token_id]
-        if nft.owner != seller:
+        if self.nfts.owner_of(token_id) != seller:
             raise Exception("Not the owner")
             
-        nft.is_for_sale = False
-        if token_id in self.for_sale:
-            del self.for_sale[token_id]
-            
-        # Generate mock transaction hash
-        tx_hash = f"0x{token_id:064x}_remove"
-        return tx_hash
+        self.nfts.set_price(token_id, None)
+        self.for_sale.remove(token_id)
+        self.emit("NFTRemovedFromSale", tokenId=str(token_id))
         
-    def buy_nft(self, token_id: int, buyer: str, price: str) -> str:
+    def buy_nft(self, token_id: int, buyer: str, price: str):
         """Buy NFT from sale"""
         if token_id not in self.for_sale:
             raise Exception("NFT not for sale")
             
-        if self.for_sale[token_id] != price:
+        if self.for_sale[token_id] != self._parse_price(price):
             raise Exception("Price mismatch")
             
-        nft = self.nfts[token_id]
-        old_owner = nft.owner
+        old_owner = self.nfts.owner_of(token_id)
+        price_wei = self.for_sale[token_id]
         
         # Transfer ownership
-        nft.owner = buyer
-        nft.is_for_sale = False
-        nft.price = None
+        self.nfts.set_owner(token_id, buyer)
+        self.nfts.set_price(token_id, None)
         
-        # Update owner lists
+        # Update owner sets
         if old_owner in self.owners:
-            self.owners[old_owner].remove(token_id)
-        if buyer not in self.owners:
-            self.owners[buyer] = []
-        self.owners[buyer].append(token_id)
+            self.owners[old_owner].discard(token_id)
+        self.owners.setdefault(buyer, set()).add(token_id)
+        
+        self.for_sale.remove(token_id)
+        self.emit("Transfer", **{"from": old_owner, "to": buyer, "tokenId": str(token_id)})
+        self.emit("Sale", tokenId=str(token_id), seller=old_owner, buyer=buyer, price=str(price_wei))
         
-        del self.for_sale[token_id]
+    def emit(self, event: str, **args: str):
+        """Record an event for the transaction currently being executed"""
+        self.emitted.append({"event": event, **args})
         
-        # Generate mock transaction hash
-        tx_hash = f"0x{token_id:064x}_buy"
-        return tx_hash
+    def drain_events(self) -> List[Dict[str, str]]:
+        """Hand over and clear the events emitted so far"""
+        events, self.emitted = self.emitted, []
+        return events
         
     def get_nft(self, token_id: int) -> Optional[NFTMetadata]:
         """Get NFT by token ID"""
@@ -164,11 +729,68 @@ class MockMyModusNFT:
         """Get all NFTs owned by user"""
         if user_address not in self.owners:
             return []
-        return [self.nfts[token_id] for token_id in self.owners[user_address]]
+        return [self.nfts[token_id] for token_id in sorted(self.owners[user_address])]
         
     def get_nfts_for_sale(self) -> List[NFTMetadata]:
-        """Get all NFTs currently for sale"""
-        return [self.nfts[token_id] for token_id in self.for_sale.keys()]
+        """Get all NFTs currently for sale, cheapest first"""
+        return [self.nfts[token_id] for token_id in self.for_sale]
+        
+    def get_nfts_for_sale_page(self, min_price: Optional[str] = None,
+                               max_price: Optional[str] = None,
+                               cursor: Optional[str] = None, limit: int = 50,
+                               descending: bool = False) -> Tuple[List[NFTMetadata], Optional[str]]:
+        """Get one page of NFTs for sale in price order, plus the next page cursor"""
+        token_ids, next_cursor = self.for_sale.page(
+            None if min_price is None else int(min_price),
+            None if max_price is None else int(max_price),
+            cursor, limit, descending
+        )
+        return [self.nfts[token_id] for token_id in token_ids], next_cursor
+        
+    def get_cheapest_nfts(self, count: int = 1) -> List[NFTMetadata]:
+        """Get the cheapest NFTs for sale"""
+        return [self.nfts[token_id] for token_id in self.for_sale.cheapest(count)]
+        
+    def get_most_expensive_nfts(self, count: int = 1) -> List[NFTMetadata]:
+        """Get the most expensive NFTs for sale"""
+        return [self.nfts[token_id] for token_id in self.for_sale.most_expensive(count)]
+        
+    def get_nfts_by_traits(self, traits: Dict[str, str], after: int = 0,
+                           limit: Optional[int] = None) -> List[NFTMetadata]:
+        """Get NFTs matching every trait_type -> value pair, by token id"""
+        token_ids = self.nfts.find_by_traits(list(traits.items()), after, limit)
+        return [self.nfts[token_id] for token_id in token_ids]
+        
+    def export_state(self) -> Dict:
+        return {
+            "total_supply": self.total_supply,
+            "max_supply": self.max_supply,
+            "mint_price": self.mint_price,
+            "nfts": self.nfts.export_state(),
+            "owners": self.owners,
+            "for_sale": self.for_sale.export_state(),
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict) -> "MockMyModusNFT":
+        contract = cls()
+        contract.total_supply = state["total_supply"]
+        contract.max_supply = state["max_supply"]
+        contract.mint_price = state["mint_price"]
+        contract.nfts = NFTStore.from_state(state["nfts"])
+        contract.owners = state["owners"]
+        contract.for_sale = OrderBook.from_state(state["for_sale"])
+        return contract
+        
+    @staticmethod
+    def _parse_price(price: str) -> int:
+        try:
+            price_wei = int(price)
+        except (TypeError, ValueError):
+            raise Exception("Invalid price")
+        if price_wei <= 0:
+            raise Exception("Invalid price")
+        return price_wei
         
     def get_contract_info(self) -> Dict:
         """Get contract information"""
@@ -187,29 +809,29 @@ class MockMyModusLoyalty:
     def __init__(self):
         self.name = "MyModus Loyalty Token"
         self.symbol = "MMLT"
+        self.address = LOYALTY_CONTRACT_ADDRESS
         self.decimals = 18
         self.total_supply = "1000000000000000000000000"  # 1,000,000 tokens
         self.mint_price = "100000000000000000"  # 0.1 ETH
-        self.balances: Dict[str, str] = {}
+        self.balances: Dict[str, int] = {}
         self.users: Dict[str, bool] = {}
         self.minters: List[str] = []
         self.burners: List[str] = []
         self.paused = False
+        # events emitted since MockWeb3Service last collected them
+        self.emitted: List[Dict[str, str]] = []
         
-    def register_user(self, user_address: str) -> str:
+    def register_user(self, user_address: str):
         """Register a new user"""
         if user_address in self.users:
             raise Exception("User already registered")
             
         self.users[user_address] = True
-        self.balances[user_address] = "0"
-        
-        # Generate mock transaction hash
-        tx_hash = f"0x{hash(user_address) % 1000000:064x}"
-        return tx_hash
+        self.balances[user_address] = 0
+        self.emit("UserRegistered", user=user_address)
         
     def mint_tokens(self, to_address: str, amount: str, 
-                   from_address: str = None) -> str:
+                   from_address: str = None):
         """Mint loyalty tokens"""
         if self.paused:
             raise Exception("Contract is paused")
@@ -220,16 +842,12 @@ class MockMyModusLoyalty:
         if to_address not in self.users:
             raise Exception("User not registered")
             
-        current_balance = self.balances.get(to_address, "0")
-        new_balance = str(int(current_balance) + int(amount))
-        self.balances[to_address] = new_balance
-        
-        # Generate mock transaction hash
-        tx_hash = f"0x{hash(f'{to_address}_{amount}') % 1000000:064x}"
-        return tx_hash
+        value = self._parse_amount(amount)
+        self.balances[to_address] = self.balances.get(to_address, 0) + value
+        self.emit("Transfer", **{"from": ZERO_ADDRESS, "to": to_address, "value": str(value)})
         
     def burn_tokens(self, from_address: str, amount: str, 
-                   burner_address: str = None) -> str:
+                   burner_address: str = None):
         """Burn loyalty tokens"""
         if self.paused:
             raise Exception("Contract is paused")
@@ -240,19 +858,17 @@ class MockMyModusLoyalty:
         if from_address not in self.users:
             raise Exception("User not registered")
             
-        current_balance = self.balances.get(from_address, "0")
-        if int(current_balance) < int(amount):
+        value = self._parse_amount(amount)
+        current_balance = self.balances.get(from_address, 0)
+        if current_balance < value:
             raise Exception("Insufficient balance")
             
-        new_balance = str(int(current_balance) - int(amount))
-        self.balances[from_address] = new_balance
-        
-        # Generate mock transaction hash
-        tx_hash = f"0x{hash(f'{from_address}_{amount}_burn') % 1000000:064x}"
-        return tx_hash
+        self.balances[from_address] = current_balance - value
+        self.emit("Transfer", **{"from": from_address, "to": ZERO_ADDRESS, "value": str(value)})
+        self.emit("TokensBurned", **{"from": from_address, "amount": str(value)})
         
     def transfer_tokens(self, from_address: str, to_address: str, 
-                       amount: str) -> str:
+                       amount: str):
         """Transfer tokens between users"""
         if self.paused:
             raise Exception("Contract is paused")
@@ -260,25 +876,129 @@ class MockMyModusLoyalty:
         if from_address not in self.users or to_address not in self.users:
             raise Exception("User not registered")
             
-        current_balance = self.balances.get(from_address, "0")
-        if int(current_balance) < int(amount):
+        value = self._parse_amount(amount)
+        current_balance = self.balances.get(from_address, 0)
+        if current_balance < value:
             raise Exception("Insufficient balance")
             
         # Update balances
-        new_from_balance = str(int(current_balance) - int(amount))
-        self.balances[from_address] = new_from_balance
+        self.balances[from_address] = current_balance - value
+        self.balances[to_address] = self.balances.get(to_address, 0) + value
+        self.emit("Transfer", **{"from": from_address, "to": to_address, "value": str(value)})
+        
+    def batch_mint(self, mints: List[Tuple[str, str]], from_address: str = None,
+                   register: bool = False) -> List[Dict[str, str]]:
+        """Mint to many users at once (airdrop).
+        
+        Every entry is validated before any balance changes, so either all
+        mints apply or none do. With register=True unknown recipients are
+        registered as part of the batch. Returns one Transfer event per mint.
+        """
+        if self.paused:
+            raise Exception("Contract is paused")
+            
+        if from_address and from_address not in self.minters:
+            raise Exception("Not authorized to mint")
+            
+        credits = []
+        for to_address, amount in mints:
+            if not register and to_address not in self.users:
+                raise Exception(f"User not registered: {to_address}")
+            credits.append((to_address, self._parse_amount(amount)))
+            
+        balances = self.balances
+        events = []
+        for to_address, value in credits:
+            if to_address not in self.users:
+                self.users[to_address] = True
+                events.append({"event": "UserRegistered", "user": to_address})
+            balances[to_address] = balances.get(to_address, 0) + value
+            events.append({
+                "event": "Transfer",
+                "from": ZERO_ADDRESS,
+                "to": to_address,
+                "value": str(value)
+            })
+        self.emitted.extend(events)
+        return events
         
-        current_to_balance = self.balances.get(to_address, "0")
-        new_to_balance = str(int(current_to_balance) + int(amount))
-        self.balances[to_address] = new_to_balance
+    def batch_transfer(self, transfers: List[Tuple[str, str, str]]) -> List[Dict[str, str]]:
+        """Apply a list of (from, to, amount) transfers all-or-nothing.
         
-        # Generate mock transaction hash
-        tx_hash = f"0x{hash(f'{from_address}_{to_address}_{amount}') % 1000000:064x}"
-        return tx_hash
+        Transfers are checked in order against running balances, so a later
+        transfer may spend tokens received earlier in the same batch.
+        """
+        if self.paused:
+            raise Exception("Contract is paused")
+            
+        balances = self.balances
+        deltas: Dict[str, int] = {}
+        moves = []
+        for from_address, to_address, amount in transfers:
+            if from_address not in self.users or to_address not in self.users:
+                raise Exception("User not registered")
+            value = self._parse_amount(amount)
+            available = balances.get(from_address, 0) + deltas.get(from_address, 0)
+            if available < value:
+                raise Exception(f"Insufficient balance: {from_address}")
+            deltas[from_address] = deltas.get(from_address, 0) - value
+            deltas[to_address] = deltas.get(to_address, 0) + value
+            moves.append((from_address, to_address, value))
+            
+        for address, delta in deltas.items():
+            balances[address] = balances.get(address, 0) + delta
+        events = [
+            {"event": "Transfer", "from": f, "to": t, "value": str(v)}
+            for f, t, v in moves
+        ]
+        self.emitted.extend(events)
+        return events
+        
+    def emit(self, event: str, **args: str):
+        """Record an event for the transaction currently being executed"""
+        self.emitted.append({"event": event, **args})
+        
+    def drain_events(self) -> List[Dict[str, str]]:
+        """Hand over and clear the events emitted so far"""
+        events, self.emitted = self.emitted, []
+        return events
         
     def get_balance(self, user_address: str) -> str:
         """Get user's token balance"""
-        return self.balances.get(user_address, "0")
+        return str(self.balances.get(user_address, 0))
+        
+    def export_state(self) -> Dict:
+        return {
+            "total_supply": self.total_supply,
+            "mint_price": self.mint_price,
+            "balances": self.balances,
+            "users": self.users,
+            "minters": self.minters,
+            "burners": self.burners,
+            "paused": self.paused,
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict) -> "MockMyModusLoyalty":
+        contract = cls()
+        contract.total_supply = state["total_supply"]
+        contract.mint_price = state["mint_price"]
+        contract.balances = state["balances"]
+        contract.users = state["users"]
+        contract.minters = state["minters"]
+        contract.burners = state["burners"]
+        contract.paused = state["paused"]
+        return contract
+        
+    @staticmethod
+    def _parse_amount(amount) -> int:
+        try:
+            value = int(amount)
+        except (TypeError, ValueError):
+            raise Exception("Invalid amount")
+        if value < 0:
+            raise Exception("Invalid amount")
+        return value
         
     def get_user_info(self, user_address: str) -> Optional[Dict]:
         """Get user information"""
@@ -288,7 +1008,7 @@ class MockMyModusLoyalty:
         return {
             "address": user_address,
             "registered": self.users[user_address],
-            "balance": self.balances.get(user_address, "0"),
+            "balance": str(self.balances.get(user_address, 0)),
             "isMinter": user_address in self.minters,
             "isBurner": user_address in self.burners
         }
@@ -304,6 +1024,138 @@ class MockMyModusLoyalty:
             "paused": self.paused
         }
 
+class Mempool:
+    """FIFO of executed transactions waiting for block inclusion.
+    
+    Contract calls run when they are submitted, so blocks must include
+    transactions in submission order to stay consistent with state.
+    """
+    
+    def __init__(self):
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self.gas = 0
+        
+    def __len__(self) -> int:
+        return len(self._queue)
+        
+    def add(self, tx: Transaction):
+        with self._lock:
+            self._queue.append(tx)
+            self.gas += tx.gas_used
+            
+    def take(self, gas_limit: int) -> List[Transaction]:
+        """Pop transactions in order until the next one would exceed gas_limit.
+        
+        A single transaction larger than the limit is taken alone, so an
+        oversized batch call gets a block of its own instead of stalling.
+        """
+        with self._lock:
+            txs = []
+            gas = 0
+            queue = self._queue
+            while queue and (not txs or gas + queue[0].gas_used <= gas_limit):
+                tx = queue.popleft()
+                gas += tx.gas_used
+                txs.append(tx)
+            self.gas -= gas
+            return txs
+            
+    def pending(self) -> List[Transaction]:
+        with self._lock:
+            return list(self._queue)
+
+class BlockBuilder:
+    """Packs mempool transactions into blocks and prices gas.
+    
+    block_time=None seals a block for every transaction (the old behaviour).
+    With a block time, blocks are sealed when the next transaction would not
+    fit the gas limit, on MockWeb3Service.mine(), or by mine_due() once
+    block_time wall-clock seconds have passed since the block was opened.
+    Only the last depends on the clock, and it is logged as an explicit
+    seal_block so op-log replays build the same blocks. Block timestamps
+    advance by exactly block_time, so simulated time reflects how many
+    blocks the load needed, not how fast the mock ran.
+    
+    With a block time the base fee follows EIP-1559: it moves by up to 1/8
+    per block towards keeping blocks half full. One-transaction blocks are
+    never half full, so without a block time the base fee stays fixed.
+    """
+    
+    def __init__(self, gas_limit: int = 30000000, block_time: Optional[float] = None,
+                 base_fee: int = 19000000000, priority_fee: int = 1000000000):
+        self.gas_limit = gas_limit
+        self.block_time = block_time
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+        self.opened_at = time.monotonic()
+        
+    @property
+    def gas_price(self) -> int:
+        return self.base_fee + self.priority_fee
+        
+    def is_due(self, pending_gas: int) -> bool:
+        if self.block_time is None:
+            return pending_gas > 0
+        if pending_gas >= self.gas_limit:
+            return True
+        return pending_gas > 0 and time.monotonic() - self.opened_at >= self.block_time
+        
+    def next_base_fee(self, gas_used: int) -> int:
+        if self.block_time is None:
+            return self.base_fee
+        target = self.gas_limit // 2
+        delta = self.base_fee * (min(gas_used, self.gas_limit) - target) // target // 8
+        return max(7, self.base_fee + delta)
+        
+    def build(self, number: int, parent: Optional[Block], first_seq: int,
+              txs: List[Transaction]) -> Block:
+        """Stamp txs with their inclusion info and return the sealed block"""
+        if parent is None:
+            timestamp = time.time()
+        elif self.block_time is None:
+            timestamp = max(time.time(), parent.timestamp)
+        else:
+            timestamp = parent.timestamp + self.block_time
+        iso_time = datetime.fromtimestamp(timestamp).isoformat()
+        gas_price = str(self.gas_price)
+        gas_used = 0
+        digest = hashlib.sha256(f"{number}:{parent.hash if parent else ''}".encode())
+        for i, tx in enumerate(txs):
+            tx.block_number = number
+            tx.transaction_index = i
+            tx.timestamp = iso_time
+            tx.gas_price = gas_price
+            gas_used += tx.gas_used
+            tx.cumulative_gas_used = gas_used
+            digest.update(tx.hash.encode())
+        block = Block(
+            number=number,
+            hash="0x" + digest.hexdigest(),
+            parent_hash=parent.hash if parent else "0x" + "0" * 64,
+            timestamp=timestamp,
+            gas_limit=self.gas_limit,
+            gas_used=gas_used,
+            base_fee=self.base_fee,
+            first_transaction=first_seq,
+            transaction_count=len(txs)
+        )
+        self.base_fee = self.next_base_fee(gas_used)
+        self.opened_at = time.monotonic()
+        return block
+        
+    def export_state(self) -> Dict:
+        return {
+            "gas_limit": self.gas_limit,
+            "block_time": self.block_time,
+            "base_fee": self.base_fee,
+            "priority_fee": self.priority_fee,
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict) -> "BlockBuilder":
+        return cls(**state)
+
 class MockWeb3Service:
     """Mock Web3 service for testing"""
     
@@ -311,13 +1163,28 @@ class MockWeb3Service:
         self.nft_contract = MockMyModusNFT()
         self.loyalty_contract = MockMyModusLoyalty()
         self.transactions: List[Transaction] = []
-        self.current_block = 1000000
-        self.gas_price = "20000000000"  # 20 Gwei
+        # address -> ascending positions in self.transactions
+        self.address_index: Dict[str, List[int]] = {}
+        # tx hash -> transaction, pending ones included
+        self.hash_index: Dict[str, Transaction] = {}
+        # sender -> number of transactions sent
+        self.nonces: Dict[str, int] = {}
+        # sequence of a batch transaction -> events_by_party(); rebuilt on first
+        # history read after a snapshot load
+        self.event_parties: Dict[int, Dict[str, List[int]]] = {}
+        self.event_index = EventIndex(self.transactions)
+        self.mempool = Mempool()
+        self.block_builder = BlockBuilder()
+        self.blocks: List[Block] = []
+        self.first_block = 1000000
+        self.current_block = self.first_block  # number of the block being built
+        # optional append-only log of state-changing calls, see mock_state.py
+        self.op_log = None
         
     def connect_wallet(self, private_key: str) -> Dict:
         """Mock wallet connection"""
         # Generate mock address from private key
-        address = f"0x{hash(private_key) % 1000000000000000000000000000000000000000:040x}"
+        address = "0x" + hashlib.sha3_256(private_key.encode("utf-8")).hexdigest()[-40:]
         
         return {
             "address": address,
@@ -329,42 +1196,119 @@ class MockWeb3Service:
     def get_balance(self, address: str) -> str:
         """Get ETH balance"""
         # Mock balance
-        balance = hash(address) % 1000000000000000000000  # 0-1 ETH
+        digest = hashlib.sha3_256(address.encode("utf-8")).digest()
+        balance = int.from_bytes(digest[:16], "big") % 1000000000000000000000  # 0-1000 ETH
         return str(balance)
         
     def mint_nft(self, to_address: str, name: str, description: str, 
                  image: str, attributes: List[Dict[str, str]]) -> Dict:
         """Mint NFT"""
         try:
-            token_id, tx_hash = self.nft_contract.mint(
+            token_id = self.nft_contract.mint(
                 to_address, name, description, image, attributes
             )
             
             # Create transaction record
-            tx = Transaction(
-                hash=tx_hash,
-                from_address="0x0000000000000000000000000000000000000000",
-                to_address=to_address,
-                value="0",
-                gas_used=150000,
-                gas_price=self.gas_price,
-                block_number=self.current_block,
-                timestamp=datetime.now().isoformat(),
-                status="success",
-                contract_address="0x1234567890123456789012345678901234567890",
-                method="mint"
+            tx = self.commit_transaction(
+                self.nft_contract, ZERO_ADDRESS, to_address, "0", "mint", len(attributes)
             )
-            self.transactions.append(tx)
-            self.current_block += 1
+            self.log_operation("mint_nft", to_address, name, description, image, attributes)
             
             return {
                 "success": True,
                 "tokenId": token_id,
-                "transactionHash": tx_hash,
-                "contractAddress": "0x1234567890123456789012345678901234567890"
+                "transactionHash": tx.hash,
+                "contractAddress": NFT_CONTRACT_ADDRESS
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def batch_mint_nfts(self, mints: List[Tuple[str, str, str, str, List[Dict[str, str]]]]) -> Dict:
+        """Mint many NFTs in a single transaction"""
+        try:
+            token_ids = self.nft_contract.batch_mint(mints)
+            tx = self.commit_transaction(
+                self.nft_contract, ZERO_ADDRESS, NFT_CONTRACT_ADDRESS, "0", "batchMint", len(token_ids)
+            )
+            self.log_operation("batch_mint_nfts", mints)
+            
+            return {
+                "success": True,
+                "tokenIds": token_ids,
+                "transactionHash": tx.hash,
+                "contractAddress": NFT_CONTRACT_ADDRESS
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def list_nft_for_sale(self, token_id: int, price: str, seller: str) -> Dict:
+        """Put an NFT up for sale"""
+        try:
+            self.nft_contract.put_for_sale(token_id, price, seller)
+            tx = self.commit_transaction(
+                self.nft_contract, seller, NFT_CONTRACT_ADDRESS, "0", "putForSale"
+            )
+            self.log_operation("list_nft_for_sale", token_id, price, seller)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def unlist_nft(self, token_id: int, seller: str) -> Dict:
+        """Take an NFT off sale"""
+        try:
+            self.nft_contract.remove_from_sale(token_id, seller)
+            tx = self.commit_transaction(
+                self.nft_contract, seller, NFT_CONTRACT_ADDRESS, "0", "removeFromSale"
+            )
+            self.log_operation("unlist_nft", token_id, seller)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash
             }
             
         except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def buy_nft(self, token_id: int, buyer: str, price: str) -> Dict:
+        """Buy an NFT that is for sale"""
+        try:
+            self.nft_contract.buy_nft(token_id, buyer, price)
+            tx = self.commit_transaction(
+                self.nft_contract, buyer, NFT_CONTRACT_ADDRESS, price, "buyNFT"
+            )
+            self.log_operation("buy_nft", token_id, buyer, price)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash
+            }
+            
+        except Exception as e:
+            self._discard_events()
             return {
                 "success": False,
                 "error": str(e)
@@ -372,43 +1316,233 @@ class MockWeb3Service:
             
     def create_loyalty_tokens(self, to_address: str, amount: str) -> Dict:
         """Create loyalty tokens"""
+        registered = False
         try:
             # Register user if not exists
             if to_address not in self.loyalty_contract.users:
                 self.loyalty_contract.register_user(to_address)
+                registered = True
                 
             # Mint tokens
-            tx_hash = self.loyalty_contract.mint_tokens(to_address, amount)
+            self.loyalty_contract.mint_tokens(to_address, amount)
             
             # Create transaction record
-            tx = Transaction(
-                hash=tx_hash,
-                from_address="0x0000000000000000000000000000000000000000",
-                to_address=to_address,
-                value=amount,
-                gas_used=100000,
-                gas_price=self.gas_price,
-                block_number=self.current_block,
-                timestamp=datetime.now().isoformat(),
-                status="success",
-                contract_address="0x0987654321098765432109876543210987654321",
-                method="mint"
+            tx = self.commit_transaction(
+                self.loyalty_contract, ZERO_ADDRESS, to_address, amount, "mint"
+            )
+            self.log_operation("create_loyalty_tokens", to_address, amount)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash,
+                "contractAddress": LOYALTY_CONTRACT_ADDRESS
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            # a failed call is not logged, so it must not leave the registration behind
+            if registered:
+                del self.loyalty_contract.users[to_address]
+                del self.loyalty_contract.balances[to_address]
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def transfer_loyalty_tokens(self, from_address: str, to_address: str, amount: str) -> Dict:
+        """Transfer loyalty tokens between users"""
+        try:
+            self.loyalty_contract.transfer_tokens(from_address, to_address, amount)
+            tx = self.commit_transaction(
+                self.loyalty_contract, from_address, to_address, amount, "transfer"
+            )
+            self.log_operation("transfer_loyalty_tokens", from_address, to_address, amount)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def burn_loyalty_tokens(self, from_address: str, amount: str) -> Dict:
+        """Burn a user's loyalty tokens"""
+        try:
+            self.loyalty_contract.burn_tokens(from_address, amount)
+            tx = self.commit_transaction(
+                self.loyalty_contract, from_address, ZERO_ADDRESS, amount, "burn"
             )
-            self.transactions.append(tx)
-            self.current_block += 1
+            self.log_operation("burn_loyalty_tokens", from_address, amount)
             
             return {
                 "success": True,
-                "transactionHash": tx_hash,
-                "contractAddress": "0x0987654321098765432109876543210987654321"
+                "transactionHash": tx.hash
             }
             
         except Exception as e:
+            self._discard_events()
             return {
                 "success": False,
                 "error": str(e)
             }
             
+    def airdrop_loyalty_tokens(self, recipients: List[Tuple[str, str]]) -> Dict:
+        """Credit loyalty tokens to many users in a single transaction"""
+        try:
+            events = self.loyalty_contract.batch_mint(recipients, register=True)
+            credits = [e for e in events if e["event"] == "Transfer"]
+            total = sum(int(e["value"]) for e in credits)
+            tx = self.commit_transaction(
+                self.loyalty_contract, ZERO_ADDRESS, LOYALTY_CONTRACT_ADDRESS,
+                str(total), "batchMint", len(credits)
+            )
+            self.log_operation("airdrop_loyalty_tokens", recipients)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash,
+                "recipients": len(credits),
+                "contractAddress": LOYALTY_CONTRACT_ADDRESS
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def batch_transfer_loyalty_tokens(self, transfers: List[Tuple[str, str, str]]) -> Dict:
+        """Apply many loyalty token transfers as a single transaction"""
+        try:
+            events = self.loyalty_contract.batch_transfer(transfers)
+            total = sum(int(e["value"]) for e in events)
+            tx = self.commit_transaction(
+                self.loyalty_contract, ZERO_ADDRESS, LOYALTY_CONTRACT_ADDRESS,
+                str(total), "batchTransfer", len(events)
+            )
+            self.log_operation("batch_transfer_loyalty_tokens", transfers)
+            
+            return {
+                "success": True,
+                "transactionHash": tx.hash,
+                "transfers": len(events),
+                "contractAddress": LOYALTY_CONTRACT_ADDRESS
+            }
+            
+        except Exception as e:
+            self._discard_events()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    def _discard_events(self):
+        """Drop events a failed call emitted before raising, so the next transaction does not carry them"""
+        self.nft_contract.drain_events()
+        self.loyalty_contract.drain_events()
+        
+    @property
+    def gas_price(self) -> str:
+        """Gas price a transaction submitted now would pay"""
+        return str(self.block_builder.gas_price)
+        
+    def configure_blocks(self, gas_limit: int = 30000000, block_time: Optional[float] = 12.0):
+        """Switch block production mode, sealing whatever is pending first"""
+        self.mine()
+        self.block_builder.gas_limit = gas_limit
+        self.block_builder.block_time = block_time
+        self.log_operation("configure_blocks", gas_limit, block_time)
+        
+    def commit_transaction(self, contract, from_address: str, to_address: str,
+                           value: str, method: str, items: int = 0) -> Transaction:
+        """Queue a transaction carrying the events the contract emitted for it.
+        
+        The sender's nonce is consumed and the hash derived from the
+        transaction's content, see transaction_hash().
+        """
+        base_gas, item_gas = GAS_SCHEDULE[contract.address][method]
+        gas_used = base_gas + item_gas * items
+        builder = self.block_builder
+        # seal the open block first if this transaction would not fit in it
+        if builder.block_time is not None and self.mempool.gas \
+                and self.mempool.gas + gas_used > builder.gas_limit:
+            self._seal_block()
+        nonce = self.nonces.get(from_address, 0)
+        self.nonces[from_address] = nonce + 1
+        events = contract.drain_events()
+        tx = Transaction(
+            hash=transaction_hash(
+                from_address, nonce, contract.address, to_address, method, value, events
+            ),
+            from_address=from_address,
+            to_address=to_address,
+            value=value,
+            gas_used=gas_used,
+            gas_price=self.gas_price,
+            block_number=self.current_block,
+            timestamp="",  # set when the block is sealed
+            status="success",
+            contract_address=contract.address,
+            method=method,
+            events=events,
+            nonce=nonce
+        )
+        self.hash_index[tx.hash] = tx
+        self.mempool.add(tx)
+        # block time based sealing is left to mine_due(), which logs it
+        if builder.block_time is None or self.mempool.gas >= builder.gas_limit:
+            self._seal_block()
+        return tx
+        
+    def seal_block(self) -> Optional[Block]:
+        """Build the next block from the mempool, returns None if it is empty"""
+        block = self._seal_block()
+        if block is not None:
+            self.log_operation("seal_block")
+        return block
+        
+    def _seal_block(self) -> Optional[Block]:
+        txs = self.mempool.take(self.block_builder.gas_limit)
+        if not txs:
+            return None
+        parent = self.blocks[-1] if self.blocks else None
+        block = self.block_builder.build(self.current_block, parent, len(self.transactions), txs)
+        for tx in txs:
+            self.record_transaction(tx)
+        self.blocks.append(block)
+        self.current_block += 1
+        return block
+        
+    def mine(self) -> int:
+        """Seal blocks until the mempool is empty, returns how many were sealed"""
+        count = 0
+        while self._seal_block() is not None:
+            count += 1
+        if count:
+            self.log_operation("mine")
+        return count
+        
+    def mine_due(self) -> Optional[Block]:
+        """Seal the open block if its gas limit or block time has been reached"""
+        if self.block_builder.is_due(self.mempool.gas):
+            return self.seal_block()
+        return None
+        
+    def get_block(self, number: int) -> Optional[Block]:
+        """Sealed block by number"""
+        i = number - self.first_block
+        return self.blocks[i] if 0 <= i < len(self.blocks) else None
+        
+    def get_transaction_count(self, address: str) -> int:
+        """Next nonce of a sender, i.e. how many transactions it has sent"""
+        return self.nonces.get(address, 0)
+        
     def get_user_nfts(self, user_address: str) -> List[Dict]:
         """Get user's NFTs"""
         nfts = self.nft_contract.get_user_nfts(user_address)
@@ -419,27 +1553,218 @@ class MockWeb3Service:
         nfts = self.nft_contract.get_nfts_for_sale()
         return [asdict(nft) for nft in nfts]
         
+    def get_nfts_for_sale_page(self, min_price: Optional[str] = None,
+                               max_price: Optional[str] = None,
+                               cursor: Optional[str] = None, limit: int = 50,
+                               descending: bool = False) -> Dict:
+        """Get a price-ordered page of NFTs for sale"""
+        nfts, next_cursor = self.nft_contract.get_nfts_for_sale_page(
+            min_price, max_price, cursor, limit, descending
+        )
+        return {
+            "items": [asdict(nft) for nft in nfts],
+            "nextCursor": next_cursor
+        }
+        
+    def get_nfts_by_traits(self, traits: Dict[str, str], after: int = 0,
+                           limit: Optional[int] = None) -> List[Dict]:
+        """Get NFTs carrying all of the given traits"""
+        nfts = self.nft_contract.get_nfts_by_traits(traits, after, limit)
+        return [asdict(nft) for nft in nfts]
+        
     def get_loyalty_balance(self, user_address: str) -> str:
         """Get user's loyalty token balance"""
         return self.loyalty_contract.get_balance(user_address)
         
-    def get_transaction_history(self, address: str, limit: int = 50) -> List[Dict]:
-        """Get transaction history for address"""
-        user_txs = [
-            tx for tx in self.transactions 
-            if tx.from_address == address or tx.to_address == address
-        ]
+    def record_transaction(self, tx: Transaction) -> int:
+        """Append a transaction and index it under every party, returns its sequence"""
+        seq = len(self.transactions)
+        self.transactions.append(tx)
+        addresses = {tx.from_address, tx.to_address}
+        if len(tx.events) >= EVENT_PARTIES_MIN_EVENTS:
+            # the same walk over the events yields the map history pages need
+            parties = self.event_parties[seq] = events_by_party(tx.events)
+            addresses.update(parties)
+        else:
+            for event in tx.events:
+                for key in ADDRESS_ARGS:
+                    if key in event:
+                        addresses.add(event[key])
+        self.event_index.add(seq, tx)
+        index = self.address_index
+        for address in addresses:
+            positions = index.get(address)
+            if positions is None:
+                index[address] = [seq]
+            else:
+                positions.append(seq)
+        return seq
+        
+    def get_transaction_history(self, address: str, limit: int = 50,
+                                method: Optional[str] = None,
+                                contract_address: Optional[str] = None) -> List[Dict]:
+        """Get transaction history for address (newest first)"""
+        return self.get_transaction_history_page(
+            address, limit=limit, method=method, contract_address=contract_address
+        )["items"]
         
-        # Sort by timestamp (newest first)
-        user_txs.sort(key=lambda x: x.timestamp, reverse=True)
+    def get_transaction_history_page(self, address: str, limit: int = 50,
+                                     cursor: Optional[str] = None,
+                                     method: Optional[str] = None,
+                                     contract_address: Optional[str] = None) -> Dict:
+        """Get one page of an address's transactions, newest first.
         
-        return [asdict(tx) for tx in user_txs[:limit]]
+        Walks only the address's own index; the cursor is the sequence of the
+        last transaction returned. Items carry only the events involving
+        address, so a wallet's view of an airdrop is its own credit rather
+        than every recipient's.
+        """
+        if limit < 1:
+            raise Exception("Invalid limit")
+        positions = self.address_index.get(address, [])
+        end = len(positions)
+        if cursor is not None:
+            try:
+                end = bisect_left(positions, int(cursor))
+            except ValueError:
+                raise Exception("Invalid cursor")
+                
+        items = []
+        next_cursor = None
+        last_seq = None
+        for i in range(end - 1, -1, -1):
+            tx = self.transactions[positions[i]]
+            if method is not None and tx.method != method:
+                continue
+            if contract_address is not None and tx.contract_address != contract_address:
+                continue
+            if len(items) == limit:
+                # only hand out a cursor when another match actually exists
+                next_cursor = str(last_seq)
+                break
+            items.append(transaction_to_dict(tx, self.address_events(positions[i], address)))
+            last_seq = positions[i]
+            
+        return {
+            "items": items,
+            "nextCursor": next_cursor
+        }
+        
+    def address_events(self, seq: int, address: str) -> List[Dict[str, str]]:
+        """Events of the transaction at seq that involve address"""
+        events = self.transactions[seq].events
+        if len(events) < EVENT_PARTIES_MIN_EVENTS:
+            return [event for event in events
+                    if any(event.get(key) == address for key in ADDRESS_ARGS)]
+        parties = self.event_parties.get(seq)
+        if parties is None:
+            parties = self.event_parties[seq] = events_by_party(events)
+        return [events[i] for i in parties.get(address, ())]
+        
+    def log_operation(self, method: str, *args):
+        """Append a successful state-changing call to the operation log, if any"""
+        if self.op_log is not None:
+            self.op_log.append(method, args)
+            
+    def export_state(self) -> Dict:
+        """Plain-data copy of the whole mock chain state"""
+        return {
+            "nft_contract": self.nft_contract.export_state(),
+            "loyalty_contract": self.loyalty_contract.export_state(),
+            "transactions": [
+                tuple(getattr(tx, name) for name in TRANSACTION_FIELDS)
+                for tx in self.transactions
+            ],
+            "address_index": self.address_index,
+            "nonces": self.nonces,
+            "event_index": self.event_index.export_state(),
+            "pending": [
+                tuple(getattr(tx, name) for name in TRANSACTION_FIELDS)
+                for tx in self.mempool.pending()
+            ],
+            "blocks": [tuple(getattr(b, name) for name in BLOCK_FIELDS) for b in self.blocks],
+            "block_builder": self.block_builder.export_state(),
+            "first_block": self.first_block,
+            "current_block": self.current_block,
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict) -> "MockWeb3Service":
+        service = cls()
+        service.nft_contract = MockMyModusNFT.from_state(state["nft_contract"])
+        service.loyalty_contract = MockMyModusLoyalty.from_state(state["loyalty_contract"])
+        service.transactions = [Transaction(*row) for row in state["transactions"]]
+        service.address_index = state["address_index"]
+        service.nonces = state["nonces"]
+        service.hash_index = {tx.hash: tx for tx in service.transactions}
+        service.event_index = EventIndex.from_state(state["event_index"], service.transactions)
+        for row in state["pending"]:
+            tx = Transaction(*row)
+            service.hash_index[tx.hash] = tx
+            service.mempool.add(tx)
+        service.blocks = [Block(*row) for row in state["blocks"]]
+        service.block_builder = BlockBuilder.from_state(state["block_builder"])
+        service.first_block = state["first_block"]
+        service.current_block = state["current_block"]
+        return service
+        
+    def get_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        """Find a transaction by hash, including ones still pending"""
+        return self.hash_index.get(tx_hash)
+        
+    def get_transaction_block(self, tx: Transaction) -> Optional[Block]:
+        """Block that includes tx, None while it is pending"""
+        block = self.get_block(tx.block_number)
+        if block is None or tx.transaction_index >= block.transaction_count \
+                or self.transactions[block.first_transaction + tx.transaction_index] is not tx:
+            return None
+        return block
+        
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
+        """Ethereum-style receipt for a mined transaction, None while pending"""
+        tx = self.hash_index.get(tx_hash)
+        if tx is None:
+            return None
+        block = self.get_transaction_block(tx)
+        if block is None:
+            return None
+        return {
+            "transactionHash": tx.hash,
+            "transactionIndex": hex(tx.transaction_index),
+            "blockNumber": hex(tx.block_number),
+            "blockHash": block.hash,
+            "from": tx.from_address,
+            "to": tx.to_address,
+            "contractAddress": tx.contract_address,
+            "gasUsed": hex(tx.gas_used),
+            "cumulativeGasUsed": hex(tx.cumulative_gas_used),
+            "effectiveGasPrice": hex(int(tx.gas_price)),
+            "status": "0x1" if tx.status == "success" else "0x0",
+            "logs": [
+                {
+                    "address": tx.contract_address,
+                    "topics": [event["event"]],
+                    "args": {k: v for k, v in event.items() if k != "event"},
+                    "logIndex": hex(i)
+                }
+                for i, event in enumerate(tx.events)
+            ]
+        }
+        
+    def get_logs(self, from_block: Optional[int] = None, to_block: Optional[int] = None,
+                 address: Optional[str] = None, events: Optional[List[str]] = None,
+                 args: Optional[Dict[str, str]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """getLogs-style event query by block range, contract, event name and arguments"""
+        logs = self.event_index.query(
+            from_block, to_block, [address] if address else None, events, args, limit
+        )
+        return [asdict(log) for log in logs]
         
     def get_contract_addresses(self) -> Dict:
         """Get deployed contract addresses"""
         return {
-            "MyModusNFT": "0x1234567890123456789012345678901234567890",
-            "MyModusLoyalty": "0x0987654321098765432109876543210987654321"
+            "MyModusNFT": NFT_CONTRACT_ADDRESS,
+            "MyModusLoyalty": LOYALTY_CONTRACT_ADDRESS
         }
         
     def get_network_info(self) -> Dict:
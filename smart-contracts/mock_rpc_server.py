@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Local JSON-RPC server for the MyModus mock contracts
+Serves MockWeb3Service over HTTP with Ethereum-style methods so the app's
+Web3 layer can be exercised end-to-end without a node
+
+Contract calls use a JSON shape instead of ABI-encoded data:
+    eth_call            [{"to": <contract>, "method": "getNFTsForSale", "params": [...]}, "latest"]
+    eth_sendTransaction [{"from": <sender>, "to": <contract>, "method": "buyNFT", "params": [...]}]
+"""
+
+import argparse
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from mock_contracts import (
+    LOYALTY_CONTRACT_ADDRESS,
+    NFT_CONTRACT_ADDRESS,
+    MockWeb3Service,
+)
+
+CHAIN_ID = 11155111
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+EXECUTION_ERROR = -32000
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def to_hex(value) -> str:
+    return hex(int(value))
+
+
+def parse_block(value, default: Optional[int] = None) -> Optional[int]:
+    """Block tag or hex quantity to a block number"""
+    if value is None or value in ("latest", "pending", "safe", "finalized"):
+        return default
+    if value == "earliest":
+        return 0
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        raise RpcError(INVALID_PARAMS, f"Invalid block: {value}")
+
+
+class MockRpcHandler:
+    """Maps JSON-RPC methods onto a MockWeb3Service"""
+
+    def __init__(self, service: MockWeb3Service):
+        self.service = service
+        self.methods = {
+            "web3_clientVersion": lambda: "MyModusMock/1.0",
+            "net_version": lambda: str(CHAIN_ID),
+            "eth_chainId": lambda: to_hex(CHAIN_ID),
+            "eth_blockNumber": lambda: to_hex(self.service.current_block - 1),
+            "eth_gasPrice": lambda: to_hex(self.service.gas_price),
+            "eth_getBalance": self.get_balance,
+            "eth_getBlockByNumber": self.get_block,
+            "eth_getTransactionCount": lambda address, block="latest":
+                to_hex(self.service.get_transaction_count(address)),
+            "eth_call": self.call,
+            "eth_sendTransaction": self.send_transaction,
+            "eth_getTransactionByHash": self.get_transaction,
+            "eth_getTransactionReceipt": self.get_receipt,
+            "eth_getLogs": self.get_logs,
+            "mymodus_getContractAddresses": self.service.get_contract_addresses,
+            "mymodus_getNetworkInfo": self.service.get_network_info,
+            "mymodus_getTransactionHistory": self.service.get_transaction_history_page,
+        }
+        # contract address -> view method -> service call
+        self.views = {
+            NFT_CONTRACT_ADDRESS: {
+                "getNFT": self._get_nft,
+                "getUserNFTs": self.service.get_user_nfts,
+                "getNFTsForSale": self.service.get_nfts_for_sale,
+                "getNFTsForSalePage": self.service.get_nfts_for_sale_page,
+                "getNFTsByTraits": self.service.get_nfts_by_traits,
+                "getContractInfo": self.service.nft_contract.get_contract_info,
+            },
+            LOYALTY_CONTRACT_ADDRESS: {
+                "balanceOf": self.service.get_loyalty_balance,
+                "getUserInfo": self.service.loyalty_contract.get_user_info,
+                "getContractInfo": self.service.loyalty_contract.get_contract_info,
+            },
+        }
+        # contract address -> write method -> service call taking the sender first
+        self.writes = {
+            NFT_CONTRACT_ADDRESS: {
+                "mint": lambda sender, to, name, description, image, attributes:
+                    self.service.mint_nft(to, name, description, image, attributes),
+                "batchMint": lambda sender, mints:
+                    self.service.batch_mint_nfts(mints),
+                "putForSale": lambda sender, token_id, price:
+                    self.service.list_nft_for_sale(int(token_id), price, sender),
+                "removeFromSale": lambda sender, token_id:
+                    self.service.unlist_nft(int(token_id), sender),
+                "buyNFT": lambda sender, token_id, price:
+                    self.service.buy_nft(int(token_id), sender, price),
+            },
+            LOYALTY_CONTRACT_ADDRESS: {
+                "mint": lambda sender, to, amount:
+                    self.service.create_loyalty_tokens(to, amount),
+                "transfer": lambda sender, to, amount:
+                    self.service.transfer_loyalty_tokens(sender, to, amount),
+                "burn": lambda sender, amount:
+                    self.service.burn_loyalty_tokens(sender, amount),
+                "batchMint": lambda sender, recipients:
+                    self.service.airdrop_loyalty_tokens(recipients),
+                "batchTransfer": lambda sender, transfers:
+                    self.service.batch_transfer_loyalty_tokens(transfers),
+            },
+        }
+
+    def handle_payload(self, payload: Any) -> Optional[Any]:
+        """Handle a single request or a batch, returns None when nothing is due back"""
+        if isinstance(payload, list):
+            if not payload:
+                return self.error(None, INVALID_REQUEST, "Empty batch")
+            responses = [self.handle_request(request) for request in payload]
+            responses = [response for response in responses if response is not None]
+            return responses or None
+        return self.handle_request(payload)
+
+    def handle_request(self, request: Any) -> Optional[Dict]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            return self.error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        params = request.get("params", [])
+        try:
+            method = self.methods.get(request["method"])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            try:
+                if isinstance(params, dict):
+                    result = method(**params)
+                elif isinstance(params, list):
+                    result = method(*params)
+                else:
+                    raise RpcError(INVALID_PARAMS, "params must be an array or object")
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+        except RpcError as e:
+            return None if is_notification else self.error(request_id, e.code, e.message)
+        except Exception as e:
+            return None if is_notification else self.error(request_id, EXECUTION_ERROR, str(e))
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def error(request_id, code: int, message: str) -> Dict:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def get_balance(self, address: str, block: str = "latest") -> str:
+        return to_hex(self.service.get_balance(address))
+
+    def get_block(self, block: str = "latest", full_transactions: bool = False) -> Optional[Dict]:
+        number = parse_block(block, self.service.current_block - 1)
+        sealed = self.service.get_block(number)
+        if sealed is None:
+            return None
+        txs = self.service.transactions[sealed.first_transaction:
+                                        sealed.first_transaction + sealed.transaction_count]
+        return {
+            "number": to_hex(sealed.number),
+            "hash": sealed.hash,
+            "parentHash": sealed.parent_hash,
+            "timestamp": to_hex(sealed.timestamp),
+            "gasLimit": to_hex(sealed.gas_limit),
+            "gasUsed": to_hex(sealed.gas_used),
+            "baseFeePerGas": to_hex(sealed.base_fee),
+            "transactions": [self.transaction_object(tx) if full_transactions else tx.hash for tx in txs],
+        }
+
+    def call(self, call: Dict, block: str = "latest") -> Any:
+        views = self.views.get(call.get("to"))
+        if views is None:
+            raise RpcError(EXECUTION_ERROR, f"No contract at {call.get('to')}")
+        view = views.get(call.get("method"))
+        if view is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Unknown view: {call.get('method')}")
+        return view(*call.get("params", []))
+
+    def send_transaction(self, tx: Dict) -> str:
+        writes = self.writes.get(tx.get("to"))
+        if writes is None:
+            raise RpcError(EXECUTION_ERROR, f"No contract at {tx.get('to')}")
+        write = writes.get(tx.get("method"))
+        if write is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Unknown method: {tx.get('method')}")
+        result = write(tx.get("from"), *tx.get("params", []))
+        if not result.get("success"):
+            raise RpcError(EXECUTION_ERROR, result.get("error", "Transaction failed"))
+        return result["transactionHash"]
+
+    def get_transaction(self, tx_hash: str) -> Optional[Dict]:
+        tx = self.service.get_transaction(tx_hash)
+        return self.transaction_object(tx) if tx else None
+
+    def transaction_object(self, tx) -> Dict:
+        """Ethereum-shaped transaction; block fields are null while it is pending"""
+        block = self.service.get_transaction_block(tx)
+        return {
+            "hash": tx.hash,
+            "nonce": to_hex(tx.nonce),
+            "blockHash": block.hash if block else None,
+            "blockNumber": to_hex(block.number) if block else None,
+            "transactionIndex": to_hex(tx.transaction_index) if block else None,
+            "from": tx.from_address,
+            "to": tx.to_address,
+            "value": to_hex(tx.value),
+            "gas": to_hex(tx.gas_used),
+            "gasPrice": to_hex(tx.gas_price),
+            "contractAddress": tx.contract_address,
+            "method": tx.method,
+        }
+
+    def get_receipt(self, tx_hash: str) -> Optional[Dict]:
+        return self.service.get_transaction_receipt(tx_hash)
+
+    def get_logs(self, log_filter: Dict) -> List[Dict]:
+        topics = log_filter.get("topics") or []
+        events = topics[0] if topics else None
+        if isinstance(events, str):
+            events = [events]
+        # like a node, a missing or "latest" bound means the last sealed block
+        latest = self.service.current_block - 1
+        logs = self.service.event_index.query(
+            parse_block(log_filter.get("fromBlock"), latest),
+            parse_block(log_filter.get("toBlock"), latest),
+            [log_filter["address"]] if isinstance(log_filter.get("address"), str)
+            else log_filter.get("address"),
+            events,
+            log_filter.get("args"),
+        )
+        return [
+            {
+                "address": log.address,
+                "topics": [log.event],
+                "args": log.args,
+                "blockNumber": to_hex(log.block_number),
+                "transactionHash": log.transaction_hash,
+                "logIndex": to_hex(log.log_index),
+            }
+            for log in logs
+        ]
+
+    def _get_nft(self, token_id) -> Optional[Dict]:
+        nft = self.service.nft_contract.get_nft(int(token_id))
+        return asdict(nft) if nft else None
+
+
+class MockRpcServer:
+    """Minimal HTTP/1.1 server with keep-alive for JSON-RPC POSTs"""
+
+    def __init__(self, handler: MockRpcHandler, host: str = "127.0.0.1", port: int = 8545):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        miner = None
+        if self.handler.service.block_builder.block_time is not None:
+            miner = asyncio.create_task(self.mine_blocks())
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            if miner:
+                miner.cancel()
+
+    async def mine_blocks(self):
+        """Seal blocks on the configured block time even when no traffic arrives"""
+        service = self.handler.service
+        while True:
+            await asyncio.sleep(min(1.0, service.block_builder.block_time or 1.0))
+            service.mine_due()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, _, version = request_line.decode("latin-1").rstrip("\r\n").partition(" ")
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" \
+                    and not version.endswith("HTTP/1.0")
+                if method == "OPTIONS":
+                    await self.respond(writer, 204, b"", keep_alive)
+                    continue
+                if method != "POST":
+                    await self.respond(writer, 405, b"", keep_alive)
+                    continue
+
+                length = int(headers.get("content-length", "0"))
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, b"", False)
+                    break
+                body = await reader.readexactly(length)
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    response = MockRpcHandler.error(None, PARSE_ERROR, "Parse error")
+                else:
+                    response = self.handler.handle_payload(payload)
+                data = b"" if response is None else json.dumps(response).encode("utf-8")
+                await self.respond(writer, 200 if data else 204, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool):
+        reasons = {200: "OK", 204: "No Content", 405: "Method Not Allowed", 413: "Payload Too Large"}
+        head = (
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main():
+    """Run the mock JSON-RPC server"""
+    parser = argparse.ArgumentParser(description="MyModus mock JSON-RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--snapshot", help="load state from a mock_state.py snapshot")
+    parser.add_argument("--oplog", help="operation log to replay after the snapshot")
+    parser.add_argument("--block-time", type=float,
+                        help="seconds per block; by default every transaction gets its own block")
+    parser.add_argument("--gas-limit", type=int, default=30000000, help="block gas limit")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from mock_state import restore
+        service = restore(args.snapshot, args.oplog)
+    else:
+        service = MockWeb3Service()
+    if args.block_time is not None:
+        service.configure_blocks(args.gas_limit, args.block_time)
+
+    server = MockRpcServer(MockRpcHandler(service), args.host, args.port)
+    print(f"🔗 MyModus mock JSON-RPC listening on http://{args.host}:{args.port}")
+    for name, address in service.get_contract_addresses().items():
+        print(f"  {name}: {address}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
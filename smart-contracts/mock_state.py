@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Snapshot/restore and operation log for the MyModus mock chain
+Lets tests and demos load prebuilt fixture worlds instead of replaying mints
+"""
+
+import gc
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from mock_contracts import MockWeb3Service
+
+# Snapshot layout: header followed by a marshal-encoded state dict.
+# marshal only handles plain builtins, so loading a snapshot never runs code,
+# and it is several times faster than pickle for large lists and dicts.
+SNAPSHOT_MAGIC = b"MMSNAP\x00\x01"
+SNAPSHOT_VERSION = 3
+HEADER = struct.Struct("<8sIQQ")  # magic, version, log position, payload size
+
+
+class OperationLog:
+    """Append-only JSON-lines log of state-changing MockWeb3Service calls"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+
+    def append(self, method: str, args: tuple):
+        line = json.dumps([method, list(args)], separators=(",", ":"))
+        self._file.write(line.encode("utf-8") + b"\n")
+
+    def position(self) -> int:
+        """Byte offset of the end of the log, stored in snapshots"""
+        self._file.flush()
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def read(path: str, start: int = 0) -> Iterator[Tuple[str, list]]:
+        """Yield (method, args) entries from a byte offset onwards"""
+        with open(path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write at the tail
+                method, args = json.loads(line)
+                yield method, args
+
+
+def attach_log(service: MockWeb3Service, path: str) -> OperationLog:
+    """Start logging the service's state-changing calls to path"""
+    service.op_log = OperationLog(path)
+    return service.op_log
+
+
+def replay(service: MockWeb3Service, log_path: str, start: int = 0) -> int:
+    """Re-apply logged operations to service, returns how many were applied"""
+    op_log, service.op_log = service.op_log, None
+    count = 0
+    try:
+        for method, args in OperationLog.read(log_path, start):
+            result = getattr(service, method)(*args)
+            if isinstance(result, dict) and result.get("success") is False:
+                raise Exception(f"Replay of {method} failed: {result.get('error')}")
+            count += 1
+    finally:
+        service.op_log = op_log
+    return count
+
+
+def save_snapshot(service: MockWeb3Service, path: str,
+                  log_position: Optional[int] = None) -> int:
+    """Write the service state to path atomically, returns the snapshot size"""
+    if log_position is None:
+        log_position = service.op_log.position() if service.op_log else 0
+    payload = marshal.dumps(service.export_state())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, log_position, len(payload)))
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return HEADER.size + len(payload)
+
+
+def load_snapshot(path: str) -> Tuple[MockWeb3Service, int]:
+    """Load a snapshot, returns the service and the log position it covers.
+
+    The file is memory-mapped, so parallel workers loading the same fixture
+    share the page cache instead of each reading their own copy.
+    """
+    # the state is acyclic plain data; cyclic GC passes over millions of fresh
+    # containers only slow the load down
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, log_position, size = HEADER.unpack_from(mm, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise Exception(f"Not a mock chain snapshot: {path}")
+            with memoryview(mm)[HEADER.size:HEADER.size + size] as payload:
+                state = marshal.loads(payload)
+        return MockWeb3Service.from_state(state), log_position
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def restore(snapshot_path: str, log_path: Optional[str] = None) -> MockWeb3Service:
+    """Load a snapshot and replay whatever the log recorded after it"""
+    service, log_position = load_snapshot(snapshot_path)
+    if log_path and os.path.exists(log_path):
+        replay(service, log_path, log_position)
+    return service
+
+
+def fork(service: MockWeb3Service) -> MockWeb3Service:
+    """Independent copy of the service state, e.g. one per test worker"""
+    return MockWeb3Service.from_state(marshal.loads(marshal.dumps(service.export_state())))
+
+
+def build_fixture(users: int, nfts: int) -> MockWeb3Service:
+    """Build a fixture world with registered loyalty users and minted NFTs"""
+    service = MockWeb3Service()
+    addresses = [f"0x{i:040x}" for i in range(1, users + 1)]
+    service.airdrop_loyalty_tokens([(address, "1000000000000000000") for address in addresses])
+
+    contract = service.nft_contract
+    contract.max_supply = max(contract.max_supply, nfts)
+    colors = ["Black", "White", "Red", "Blue", "Green"]
+    sizes = ["XS", "S", "M", "L", "XL"]
+    for i in range(nfts):
+        result = service.mint_nft(
+            addresses[i % len(addresses)] if addresses else f"0x{i + 1:040x}",
+            f"MyModus Item #{i + 1}",
+            "Fixture NFT",
+            f"ipfs://fixture/{i + 1}",
+            [
+                {"trait_type": "Color", "value": colors[i % len(colors)]},
+                {"trait_type": "Size", "value": sizes[(i // len(colors)) % len(sizes)]},
+            ]
+        )
+        if not result["success"]:
+            raise Exception(result["error"])
+    return service
+
+
+def main(argv: List[str]):
+    """Command line entry point"""
+    if len(argv) >= 2 and argv[0] == "build":
+        path = argv[1]
+        users = int(argv[2]) if len(argv) > 2 else 100000
+        nfts = int(argv[3]) if len(argv) > 3 else 50000
+        started = time.perf_counter()
+        service = build_fixture(users, nfts)
+        built = time.perf_counter() - started
+        size = save_snapshot(service, path)
+        print(f"Built {users} users / {nfts} NFTs in {built:.2f}s, snapshot {size / 1e6:.1f} MB")
+    elif len(argv) >= 2 and argv[0] == "load":
+        started = time.perf_counter()
+        service = restore(argv[1], argv[2] if len(argv) > 2 else None)
+        loaded = time.perf_counter() - started
+        print(f"Loaded {service.nft_contract.total_supply} NFTs, "
+              f"{len(service.loyalty_contract.users)} users, "
+              f"{len(service.transactions)} transactions in {loaded:.3f}s")
+    else:
+        print("Usage: mock_state.py build <snapshot> [users] [nfts]")
+        print("       mock_state.py load <snapshot> [oplog]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])